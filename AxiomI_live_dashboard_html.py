@@ -54,7 +54,7 @@ th,td{padding:8px 10px;text-align:left;border-bottom:1px solid rgba(255,255,255,
         <input id="fileInput" type="file" accept=".csv,.json" />
         Načítať CSV
       </label>
-      <button id="btnFetch" class="btn">Fetch (./data/rozhodnutia_with_aav.csv)</button>
+      <button id="btnFetch" class="btn">Fetch (./data/rozhodnutia_with_aav.summary.json)</button>
       <button id="btnExport" class="btn">Export PNG</button>
       <button id="btnSaveWeights" class="btn">Uložiť váhy</button>
       <button id="btnLoadWeights" class="btn">Načítať váhy</button>
@@ -92,7 +92,14 @@ th,td{padding:8px 10px;text-align:left;border-bottom:1px solid rgba(255,255,255,
       <div class="card">
         <div style="display:flex;justify-content:space-between;align-items:center">
           <div><strong>Rozhodnutia</strong><div class="small">tabuľka s AAV</div></div>
-          <div class="small">Počet záznamov: <span id="countSpan">0</span></div>
+          <div class="inline">
+            <span id="pager" class="inline" style="display:none">
+              <button id="prevPage" class="btn">←</button>
+              <span class="small" id="pageInfo"></span>
+              <button id="nextPage" class="btn">→</button>
+            </span>
+            <div class="small">Počet záznamov: <span id="countSpan">0</span></div>
+          </div>
         </div>
         <div class="table-wrap" id="tableWrap" style="margin-top:8px">
           <table id="decisionsTable"><thead><tr id="theadRow"></tr></thead><tbody id="tbody"></tbody></table>
@@ -125,6 +132,7 @@ th,td{padding:8px 10px;text-align:left;border-bottom:1px solid rgba(255,255,255,
       <div class="card">
         <div><strong>Info & Tipy</strong></div>
         <div class="small" style="margin-top:8px">Ak prehliadač zlyhá s file://, spusti v adresári: <code>python3 -m http.server 8000</code> a otvori <code>http://127.0.0.1:8000/axiom_live_dashboard.html</code></div>
+        <div class="small" style="margin-top:6px">Pre veľké CSV najprv predpočítaj súhrn: <code>python axiomatic_tool.py dashboard-summary --input data/rozhodnutia_with_aav.csv</code> (Fetch ho načíta namiesto celého CSV)</div>
         <div class="small" style="margin-top:6px">Môžem to nasadiť na GitHub Pages ak chceš — povieš a pripravím ZIP.</div>
       </div>
     </div>
@@ -156,6 +164,10 @@ let rawRows = []; // parsed rows
 let aavSeries = []; // per-row AAV
 let currentIndex = 0;
 let playTimer = null;
+let summary = null; // precomputed sidecar (axiomatic_tool.py dashboard-summary)
+let summaryBase = null; // URL without ".json", table pages are <base>.pNNNN.json
+let tablePage = 1;
+const SUMMARY_URL = './data/rozhodnutia_with_aav.summary.json';
 
 /* --------- UTIL ---------- */
 function parseNumber(s){ const n = parseFloat(String(s).replace(',', '.')); return isNaN(n)?null:n; }
@@ -326,8 +338,80 @@ function computeAavsFromRows(rows){
   return aavs;
 }
 
+/* --------- Summary sidecar ---------- */
+function weightOf(id){ return Math.max(0, parseFloat(weights[id]||1)); }
+function aavFromScores(scores){
+  // same weighted mean as computeAavsFromRows, over precomputed axiom scores (null = missing)
+  let numerator = 0, denom = 0;
+  AXIOMS.forEach((a,i)=>{ const v = scores[i]; if(v !== null && v !== undefined){ numerator += weightOf(a.id) * v; denom += weightOf(a.id); } });
+  return denom>0 ? numerator/denom : 0;
+}
+function summaryWeightsActive(){ return AXIOMS.every(a=>weightOf(a.id) === summary.weights[a.id]); }
+
+function loadSummary(obj, url){
+  summary = obj; rawRows = [];
+  summaryBase = url ? url.slice(0, -'.json'.length) : null;
+  tablePage = 1;
+  updateAll();
+}
+
+function renderSummaryPage(rows){
+  const fields = summary.table.fields;
+  const objs = rows.map(r=>{ const o = {}; fields.forEach((f,i)=>o[f]=r[i]); return o; });
+  if(!summaryWeightsActive() && fields.includes('AAV')){
+    computeAavsFromRows(objs).forEach((v,i)=>{ objs[i]['AAV'] = v.toFixed(6); });
+  }
+  renderTable(objs, fields);
+  const pages = summary.table.pages;
+  document.getElementById('pager').style.display = pages > 1 ? 'flex' : 'none';
+  document.getElementById('pageInfo').textContent = `${tablePage} / ${pages}`;
+}
+
+function showTablePage(page){
+  if(!summary || page < 1 || page > summary.table.pages) return;
+  tablePage = page;
+  if(page === 1) return renderSummaryPage(summary.table.first_page);
+  if(!summaryBase) return alert('Strany tabuľky sa dajú načítať iba cez Fetch (lokálny server).');
+  fetch(`${summaryBase}.p${String(page).padStart(4,'0')}.json`).then(r=>{
+    if(!r.ok) throw new Error('Not found');
+    return r.json();
+  }).then(obj=> renderSummaryPage(obj.rows)).catch(err=> alert('Strana tabuľky zlyhala: ' + err.message));
+}
+
+function updateFromSummary(){
+  const same = summaryWeightsActive();
+  const st = summary.stats;
+  // graph points are LTTB-selected rows; with other weights their AAV is recomputed from stored scores
+  aavSeries = same ? summary.series.aav : summary.series.scores.map(aavFromScores);
+  lineChart.data.labels = summary.series.labels;
+  lineChart.data.datasets[0].data = aavSeries;
+  lineChart.update();
+
+  const avg = same ? st.mean : aavFromScores(summary.aav_means);
+  document.getElementById('avgAav').textContent = avg!==null ? avg.toFixed(6) : '—';
+  document.getElementById('minAav').textContent = same && st.min!==null ? st.min.toFixed(6) : (aavSeries.length ? Math.min(...aavSeries).toFixed(6) : '—');
+  document.getElementById('maxAav').textContent = same && st.max!==null ? st.max.toFixed(6) : (aavSeries.length ? Math.max(...aavSeries).toFixed(6) : '—');
+  document.getElementById('countSpan').textContent = summary.rows;
+
+  radarChart.data.datasets[0].data = summary.axiom_means;
+  radarChart.update();
+  graphNodes.forEach(n=>{
+    const idx = AXIOMS.findIndex(a=>a.id===n.id);
+    n.score = summary.axiom_means[idx] || 0;
+  });
+  renderGraph();
+
+  showTablePage(tablePage);
+
+  const rep7 = summary.rep7;
+  if(!rep7){ document.getElementById('rep7banner').style.display='none'; return; }
+  showRep7(same ? rep7.delta : aavFromScores(rep7.last_means) - aavFromScores(rep7.first_means));
+}
+
 /* --------- Update visual state ---------- */
 function updateAll(){
+  if(summary) return updateFromSummary();
+  document.getElementById('pager').style.display = 'none';
   if(!rawRows.length) return;
   aavSeries = computeAavsFromRows(rawRows);
   // update line chart
@@ -386,7 +470,11 @@ function runRep7Check(series){
   const first = series.slice(0,slice); const last = series.slice(n-slice);
   const avgFirst = first.reduce((a,b)=>a+b,0)/first.length;
   const avgLast = last.reduce((a,b)=>a+b,0)/last.length;
-  const delta = avgLast - avgFirst;
+  showRep7(avgLast - avgFirst);
+}
+
+function showRep7(delta){
+  const banner = document.getElementById('rep7banner');
   if(Math.abs(delta) >= REP7_THRESHOLD){
     banner.textContent = `REP7 ALERT • ΔAAV = ${delta.toFixed(4)}`;
     banner.className = 'banner warn';
@@ -402,20 +490,24 @@ fileInput.addEventListener('change', (e)=>{
   const f = e.target.files[0]; if(!f) return;
   const name = f.name.toLowerCase();
   if(name.endsWith('.csv')){
-    Papa.parse(f,{header:true,skipEmptyLines:true,complete: (res)=> { rawRows = res.data; updateAll(); }});
+    Papa.parse(f,{header:true,skipEmptyLines:true,complete: (res)=> { summary = null; rawRows = res.data; updateAll(); }});
   } else {
-    const r=new FileReader(); r.onload=ev=>{ try{ const obj = JSON.parse(ev.target.result); if(obj.nodes) { /* graph */ } else if(Array.isArray(obj)) { rawRows = obj; updateAll(); } } catch(err){ alert('Chybný JSON'); } }; r.readAsText(f);
+    const r=new FileReader(); r.onload=ev=>{ try{ const obj = JSON.parse(ev.target.result); if(obj.nodes) { /* graph */ } else if(obj.series && obj.table) { loadSummary(obj, null); } else if(Array.isArray(obj)) { summary = null; rawRows = obj; updateAll(); } } catch(err){ alert('Chybný JSON'); } }; r.readAsText(f);
   }
 });
 
 btnFetch.addEventListener('click', ()=>{
-  fetch('./data/rozhodnutia_with_aav.csv').then(r=>{
+  // precomputed sidecar first; the full CSV only when it is missing
+  fetch(SUMMARY_URL).then(r=>{
+    if(!r.ok) throw new Error('Not found');
+    return r.json();
+  }).then(obj=> loadSummary(obj, SUMMARY_URL)).catch(()=> fetch('./data/rozhodnutia_with_aav.csv').then(r=>{
     if(!r.ok) throw new Error('Not found');
     return r.text();
   }).then(txt=>{
     const parsed = Papa.parse(txt,{header:true,skipEmptyLines:true});
-    rawRows = parsed.data; updateAll();
-  }).catch(err=>{
+    summary = null; rawRows = parsed.data; updateAll();
+  })).catch(err=>{
     alert('Fetch zlyhal: ' + err.message + '. Použi súbor alebo spusti lokálny server.');
   });
 });
@@ -463,6 +555,9 @@ function highlightIndex(i){
   lineChart.update();
 }
 
+document.getElementById('prevPage').addEventListener('click', ()=> showTablePage(tablePage - 1));
+document.getElementById('nextPage').addEventListener('click', ()=> showTablePage(tablePage + 1));
+
 /* --------- Export ---------- */
 btnExport.addEventListener('click', ()=>{
   html2canvas(document.querySelector('.main'), {backgroundColor:null, scale:2}).then(canvas=>{
@@ -482,7 +577,7 @@ const DEMO_CSV = `ID Rozhodnutia,Dátum,Zámer (INT),Existencia (LEX),Múdrosť
 3,2025-10-24,0.30,0.20,0.25,0.15,0.40,0.35,0.30,0.20,REJECT,Tretí
 4,2025-10-25,0.82,0.79,0.88,0.72,0.90,0.80,0.85,0.87,ACCEPT,Štvrtý
 5,2025-10-26,0.58,0.55,0.60,0.45,0.63,0.68,0.66,0.64,CONDITIONAL,Piaty`;
-if(!rawRows.length){
+if(!rawRows.length && !summary){
   Papa.parse(DEMO_CSV,{header:true,skipEmptyLines:true,complete:(res)=>{ rawRows=res.data; updateAll(); }});
 }
 </script>
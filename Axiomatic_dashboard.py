@@ -17,7 +17,12 @@ from io import StringIO
 import time
 from typing import List
 
+from audit_log import AuditLogIndex
+from compute_aav import compute_aav_matrix
+from online_stats import OnlineStats
+
 # --- Konfigurácia a definície ---
+AUDIT_LOG = "audit/log.jsonl"
 PRINCIPLES = [
     "Zámer (INT)",
     "Existencia (LEX)",
@@ -193,9 +198,20 @@ if uploaded_file is not None:
         # Example: compute AAV pre každý riadok ak sú stĺpce menom princípov
         if all(p in df.columns for p in PRINCIPLES):
             st.subheader("Pridám stĺpec Kompozit_AAV a Status pre každý riadok")
-            df["Kompozit_AAV"] = df.apply(lambda r: compute_aav(DEFAULT_WEIGHTS, [float(r[p]) for p in PRINCIPLES]), axis=1)
+            df["Kompozit_AAV"] = compute_aav_matrix(DEFAULT_WEIGHTS, df[PRINCIPLES])
             df["Status"] = df["Kompozit_AAV"].apply(lambda v: get_status(v)[0])
             st.dataframe(df)
+            # súhrnné štatistiky v jednom prechode (priemer, std, kvantily, počty statusov)
+            aav_stats = OnlineStats()
+            aav_stats.add_many(df["Kompozit_AAV"].tolist(), df["Status"].tolist())
+            summary = aav_stats.summary()
+            mcols = st.columns(5)
+            mcols[0].metric("Priemer AAV", f"{summary['mean']:.3f}" if summary["count"] else "n/a")
+            mcols[1].metric("Std", f"{summary['std']:.3f}" if summary["std"] is not None else "n/a")
+            mcols[2].metric("p50", f"{summary['p50']:.3f}" if summary["count"] else "n/a")
+            mcols[3].metric("p95", f"{summary['p95']:.3f}" if summary["count"] else "n/a")
+            mcols[4].metric("p99", f"{summary['p99']:.3f}" if summary["count"] else "n/a")
+            st.write("Počty statusov:", summary["status_counts"])
             # umožniť stiahnutie
             csv = df.to_csv(index=False).encode("utf-8")
             st.download_button("Stiahnuť upravené CSV", data=csv, file_name="axiomU_results.csv", mime="text/csv")
@@ -214,6 +230,28 @@ if st.checkbox("Stiahnuť CSV šablónu"):
     ]], columns=header)
     st.download_button("Stiahnuť šablónu (CSV)", df_template.to_csv(index=False), "axiomU_template.csv", mime="text/csv")
 
+# Audit log (indexované dotazy: posledné záznamy, akcia, časový rozsah)
+st.header("Audit log")
+audit_index = AuditLogIndex(AUDIT_LOG)
+audit_mode = st.selectbox("Dotaz", ("Posledné záznamy", "Podľa akcie", "Časový rozsah"))
+# checkpointy hash-reťaze nie sú auditné udalosti; zobrazia sa iba na požiadanie
+show_checkpoints = st.checkbox("Zobraziť checkpointy hash-reťaze", value=False)
+if audit_mode == "Posledné záznamy":
+    n_last = int(st.number_input("Počet záznamov", min_value=1, value=20, step=1))
+    audit_rows = audit_index.last(n_last, checkpoints=show_checkpoints)
+elif audit_mode == "Podľa akcie":
+    audit_action = st.text_input("Akcia", value="compute_aav")
+    n_limit = int(st.number_input("Max. počet záznamov", min_value=1, value=200, step=1))
+    audit_rows = list(audit_index.by_action(audit_action, limit=n_limit))
+else:
+    t_from = st.text_input("Od (ISO, UTC)", value="")
+    t_to = st.text_input("Do (ISO, UTC)", value="")
+    audit_rows = list(audit_index.between(t_from or None, t_to or None, checkpoints=show_checkpoints))
+if audit_rows:
+    st.dataframe(pd.DataFrame(audit_rows))
+else:
+    st.info("Žiadne audit záznamy pre zvolený dotaz.")
+
 st.markdown("---")
 st.markdown("Spustenie lokálne: `streamlit run axiomatic_dashboard.py`")
 st.markdown("Bezpečnostná poznámka: toto je demo. Pred nasadením pridaj autentifikáciu, validáciu vstupov a audit.log.")
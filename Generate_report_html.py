@@ -4,11 +4,15 @@
 generate_report_html.py
 
 Vytvorí pekný, interaktívny (frontend-ready) HTML report z:
+ - data/rozhodnutia_with_aav.parquet / .arrow (columnar, ak existuje a je k dispozícii pyarrow;
+   načítajú sa iba stĺpce AAV a Status)
  - data/rozhodnutia_with_aav.csv (preferované)
  - alebo data/rozhodnutia.csv (ak AAV chýba, report sa pokúsi inferovať)
  - a z audit/log.jsonl (vezme posledný záznam pre merkle_root a timestamp)
 
-Výstup: data/report.html (cesta zadefinovaná nižšie)
+Výstup: data/report.html (cesta zadefinovaná nižšie); pri viac ako PAGE_SIZE
+riadkoch pokračuje tabuľka na stránkach report_p0002.html, ... Report sa
+generuje streamovane v jednom prechode (ohraničená pamäť aj pre milióny riadkov).
 
 Spustenie:
     python3 generate_report_html.py
@@ -16,17 +20,22 @@ Spustenie:
 
 from __future__ import annotations
 import csv
-import json
 import os
 import sys
 import html as htmllib
-import statistics
+import io
+import itertools
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Iterable, List, Tuple, Optional, Dict, Any
+
+from audit_log import last_entry
+from columnar import column_names, iter_rows, pa
+from online_stats import OnlineStats
 
 BASE = os.path.abspath(os.path.dirname(__file__))
 DATA_WITH_AAV = os.path.join(BASE, "data", "rozhodnutia_with_aav.csv")
 DATA_RAW = os.path.join(BASE, "data", "rozhodnutia.csv")
+DATA_COLUMNAR = [os.path.join(BASE, "data", "rozhodnutia_with_aav" + ext) for ext in (".parquet", ".arrow")]
 AUDIT_LOG = os.path.join(BASE, "audit", "log.jsonl")
 OUT_HTML = os.path.join(BASE, "report.html")
 
@@ -38,21 +47,16 @@ def read_csv(path: str) -> Tuple[List[Dict[str, str]], List[str]]:
         rows = [row for row in reader]
     return rows, reader.fieldnames if reader.fieldnames else []
 
+def report_columns(names: List[str]) -> List[str]:
+    """Stĺpce, ktoré report číta z columnar súboru: AAV a Status (ak AAV chýba, axiom stĺpce na inferenciu)."""
+    cols = [c for c in names if c.strip().lower().endswith("aav")]
+    if not cols:
+        cols = [c for c in _axiom_columns(names).values() if c]
+    return cols + [c for c in names if c.strip().lower() == "status"]
+
 def last_audit_entry(audit_path: str) -> Optional[Dict[str, Any]]:
-    if not os.path.exists(audit_path):
-        return None
-    last = None
-    with open(audit_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                last = json.loads(line)
-            except Exception:
-                # ignore malformed lines
-                continue
-    return last
+    # číta od konca súboru (audit_log.tail_entries), poškodené riadky a checkpointy hash-reťaze preskočí
+    return last_entry(audit_path)
 
 def try_get_aav(row: Dict[str, str]) -> Optional[float]:
     for k in row.keys():
@@ -107,108 +111,196 @@ AXIOM_KEYWORDS = {
 
 # --- Core generator ------------------------------------------------------
 
-def generate_html(rows: List[Dict[str, str]], fieldnames: List[str], audit_last: Optional[Dict[str, Any]]) -> str:
+PAGE_SIZE = 1000          # riadkov tabuľky na stránku (ďalšie stránky: report_p0002.html, ...)
+SPARK_POINTS = 960        # max. bodov sparkline (rovnomerné riedenie pri väčšom počte)
+
+_CSS = """:root{--bg:#0f1720;--card:#111827;--muted:#94a3b8;--accent:#9ad0f5;--glass:rgba(255,255,255,0.03)}
+body{margin:0;font-family:system-ui, -apple-system, "Segoe UI", Roboto,"Helvetica Neue",Arial; background:var(--bg); color:#e6eef8}
+.container{max-width:1100px;margin:18px auto;padding:18px}
+.header{display:flex;justify-content:space-between;align-items:center;gap:12px}
+.card{background:var(--card);padding:14px;border-radius:12px;box-shadow:0 6px 18px rgba(0,0,0,0.6)}
+.h1{font-size:20px;margin:0;color:#fff}
+.meta{color:var(--muted);font-size:13px}
+.grid{display:grid;grid-template-columns:1fr 320px;gap:14px;margin-top:14px}
+.summary{display:flex;flex-direction:column;gap:10px}
+.metrics{display:flex;gap:12px}
+.metric{background:var(--glass);padding:10px;border-radius:8px;min-width:120px;text-align:center}
+.metric .val{font-weight:800;font-size:18px;color:#fff}
+.table-wrap{margin-top:14px;overflow:auto;border-radius:8px;box-shadow:0 6px 20px rgba(0,0,0,0.6)}
+table{width:100%;border-collapse:collapse}
+th,td{padding:8px 10px;text-align:left;border-bottom:1px solid rgba(255,255,255,0.03);font-size:13px}
+th{color:var(--muted);font-weight:600;font-size:12px}
+.badge{padding:6px 8px;border-radius:999px;font-weight:700;font-size:12px}
+.footer{margin-top:18px;color:var(--muted);font-size:13px;display:flex;justify-content:space-between;align-items:center}
+.small{font-size:12px;color:var(--muted)}
+.code{font-family:monospace;background:rgba(255,255,255,0.02);padding:6px;border-radius:6px}
+"""
+
+class _SparkSeries:
+    """Ohraničený rad pre sparkline: pri zaplnení zahodí každý druhý bod a zdvojnásobí krok."""
+
+    def __init__(self, max_points: int = SPARK_POINTS):
+        self.max_points = max_points
+        self.values: List[float] = []
+        self.step = 1
+        self._i = 0
+
+    def add(self, v: float) -> None:
+        if self._i % self.step == 0:
+            self.values.append(v)
+            if len(self.values) > self.max_points:
+                self.values = self.values[::2]
+                self.step *= 2
+        self._i += 1
+
+def _axiom_columns(headers: List[str]) -> Dict[str, Optional[str]]:
+    norm = {h.strip().lower(): h for h in headers}
+    found: Dict[str, Optional[str]] = {}
+    for code, aliases in AXIOM_KEYWORDS.items():
+        found[code] = None
+        for a in aliases:
+            if a in norm:
+                found[code] = norm[a]
+                break
+    return found
+
+def _inferred_aav(r: Dict[str, str], found: Dict[str, Optional[str]]) -> Optional[float]:
+    # priemer dostupných axiom stĺpcov (ak CSV nemá AAV stĺpec)
+    vals = []
+    for code, col in found.items():
+        if col:
+            try:
+                vals.append(float(str(r.get(col, "")).replace(',', '.')))
+            except Exception:
+                continue
+    return sum(vals) / len(vals) if vals else None
+
+def _table_row_html(r: Dict[str, str], visible_cols: List[str], aav: Optional[float]) -> str:
+    aav_val = f"{aav:.6f}" if aav is not None else ""
+    bar_w = max(0, min(100, (aav or 0) * 100))
+    status = r.get("Status", r.get("status", ""))
+    color = status_color(status)
+    cells = []
+    for c in visible_cols:
+        val = r.get(c, "")
+        if c.strip().lower().endswith("aav"):
+            cell_html = (
+                f'<div style="display:flex;gap:8px;align-items:center;">'
+                f'<div style="min-width:70px;font-weight:700">{htmllib.escape(aav_val)}</div>'
+                f'<div style="flex:1;background:#2b2b2b;border-radius:6px;height:12px;overflow:hidden">'
+                f'<div style="width:{bar_w}%;height:100%;background:{color}"></div>'
+                f'</div></div>'
+            )
+        else:
+            cell_html = htmllib.escape(str(val))
+        cells.append(f"<td>{cell_html}</td>")
+    return "<tr>" + "".join(cells) + "</tr>\n"
+
+def _page_name(out_path: str, page: int) -> str:
+    base, ext = os.path.splitext(os.path.basename(out_path))
+    return base + ext if page == 1 else f"{base}_p{page:04d}{ext}"
+
+def _pager_html(out_path: str, page: int, has_next: bool) -> str:
+    links = []
+    if page > 1:
+        links.append(f'<a href="{_page_name(out_path, page - 1)}" style="color:var(--accent);text-decoration:none">← Predchádzajúca</a>')
+    if has_next:
+        links.append(f'<a href="{_page_name(out_path, page + 1)}" style="color:var(--accent);text-decoration:none">Ďalšia strana →</a>')
+    if not links:
+        return ""
+    return f'<div class="small" style="margin-top:10px">Strana {page} &nbsp;·&nbsp; ' + " &nbsp;·&nbsp; ".join(links) + "</div>"
+
+class _TablePage:
+    """Samostatná HTML stránka tabuľky (strany 2+), zapisovaná priebežne."""
+
+    def __init__(self, out_path: str, page: int, visible_cols: List[str]):
+        self.out_path = out_path
+        self.page = page
+        path = os.path.join(os.path.dirname(out_path), _page_name(out_path, page))
+        self.f = open(path, "w", encoding="utf-8")
+        head = ''.join(f'<th>{htmllib.escape(c)}</th>' for c in visible_cols)
+        self.f.write(
+            f'<!doctype html>\n<html lang="sk">\n<head>\n<meta charset="utf-8"/>\n'
+            f'<meta name="viewport" content="width=device-width,initial-scale=1"/>\n'
+            f'<title>Axiomatic Intelligence — Report (strana {page})</title>\n<style>\n{_CSS}</style>\n</head>\n<body>\n'
+            f'<div class="container">\n  <div class="card">\n'
+            f'    <div style="font-weight:700;margin-bottom:8px">Rozhodnutia — strana {page} '
+            f'<a href="{_page_name(out_path, 1)}" style="color:var(--accent);text-decoration:none;font-weight:400">(súhrn)</a></div>\n'
+            f'    <div class="table-wrap">\n      <table>\n        <thead><tr>{head}</tr></thead>\n        <tbody>\n'
+        )
+
+    def close(self, has_next: bool) -> None:
+        self.f.write(
+            f'        </tbody>\n      </table>\n    </div>\n    {_pager_html(self.out_path, self.page, has_next)}\n'
+            f'  </div>\n</div>\n</body>\n</html>\n'
+        )
+        self.f.close()
+
+def write_report(rows: Iterable[Dict[str, str]], fieldnames: List[str], audit_last: Optional[Dict[str, Any]],
+                 out, out_path: str = OUT_HTML, page_size: Optional[int] = PAGE_SIZE) -> int:
+    """
+    Streamovaný report v jednom prechode: riadky sa čítajú z iterátora, štatistiky
+    (OnlineStats: priemer, std, min, max, p50/p95/p99, počty statusov) sa počítajú priebežne, strany tabuľky 2+ sa zapisujú
+    hneď do samostatných súborov (<report>_p0002.html, ...). Hlavná stránka
+    (súhrn + prvá strana tabuľky) sa zapíše do `out` na konci.
+    page_size=None: celá tabuľka na hlavnej stránke. Pamäť je ohraničená veľkosťou strany.
+    Vracia počet riadkov.
+    """
     now = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    # Extract AAV series (prefer explicit AAV column)
-    aavs = []
-    for r in rows:
-        a = try_get_aav(r)
-        if a is not None and isinstance(a, float):
-            aavs.append(a)
-    # If no explicit AAV, try to infer averages from axiom columns
-    if not aavs:
-        # build normalized header map
-        headers = [h.strip() for h in fieldnames] if fieldnames else (list(rows[0].keys()) if rows else [])
-        norm = {h.lower(): h for h in headers}
-        # find mapping from AXIOM_KEYWORDS
-        found = {}
-        for code, aliases in AXIOM_KEYWORDS.items():
-            found[code] = None
-            for a in aliases:
-                if a in norm:
-                    found[code] = norm[a]
-                    break
-        # compute inferred AAV per row as mean of available axiom columns
-        for r in rows:
-            vals = []
-            for code, col in found.items():
-                if col:
-                    try:
-                        v = float(str(r.get(col, "")).replace(',', '.'))
-                        vals.append(v)
-                    except Exception:
-                        continue
-            if vals:
-                aavs.append(sum(vals) / len(vals))
-    # Stats
-    aavs_clean = [v for v in aavs if isinstance(v, (int, float))]
-    count = len(rows)
-    avg = f"{statistics.mean(aavs_clean):.6f}" if aavs_clean else "n/a"
-    mn = f"{min(aavs_clean):.6f}" if aavs_clean else "n/a"
-    mx = f"{max(aavs_clean):.6f}" if aavs_clean else "n/a"
-    last_merkle = audit_last.get("merkle_root") if audit_last else ""
-    audit_ts = audit_last.get("timestamp") if audit_last else ""
+    headers = [h.strip() for h in fieldnames]
+    has_aav_col = any(h.lower() == "aav" or h.lower().endswith("aav") for h in headers)
+    found = _axiom_columns(headers)
 
     # visible columns
-    visible_cols = fieldnames[:] if fieldnames else (list(rows[0].keys()) if rows else [])
+    visible_cols = fieldnames[:]
     if "AAV" not in visible_cols and not any(c.strip().lower().endswith("aav") for c in visible_cols):
         visible_cols.append("AAV")
 
-    # build table rows
-    table_rows_html = ""
+    count = 0
+    stats = OnlineStats()
+    spark_series = _SparkSeries()
+    first_page: List[str] = []
+    page: Optional[_TablePage] = None
     for r in rows:
-        aav = try_get_aav(r)
-        aav_val = f"{aav:.6f}" if aav is not None else ""
-        bar_w = max(0, min(100, (aav or 0) * 100))
-        status = r.get("Status", r.get("status", ""))
-        color = status_color(status)
-        cells = []
-        for c in visible_cols:
-            val = r.get(c, "")
-            if c.strip().lower().endswith("aav"):
-                cell_html = (
-                    f'<div style="display:flex;gap:8px;align-items:center;">'
-                    f'<div style="min-width:70px;font-weight:700">{htmllib.escape(aav_val)}</div>'
-                    f'<div style="flex:1;background:#2b2b2b;border-radius:6px;height:12px;overflow:hidden">'
-                    f'<div style="width:{bar_w}%;height:100%;background:{color}"></div>'
-                    f'</div></div>'
-                )
-            else:
-                cell_html = htmllib.escape(str(val))
-            cells.append(f"<td>{cell_html}</td>")
-        table_rows_html += "<tr>" + "".join(cells) + "</tr>\n"
-
-    spark = make_sparkline_svg(aavs_clean, w=480, h=60) if aavs_clean else ""
+        explicit = try_get_aav(r)
+        a = explicit if has_aav_col else _inferred_aav(r, found)
+        stats.add(a, r.get("Status", r.get("status")) or None)
+        if a is not None:
+            spark_series.add(a)
+        row_html = _table_row_html(r, visible_cols, explicit)
+        if page_size is None or count < page_size:
+            first_page.append(row_html)
+        else:
+            if count % page_size == 0:
+                if page is not None:
+                    page.close(has_next=True)
+                page = _TablePage(out_path, count // page_size + 1, visible_cols)
+            page.f.write(row_html)
+        count += 1
+    if page is not None:
+        page.close(has_next=False)
+
+    fmt = lambda v: f"{v:.6f}" if v is not None else "n/a"
+    summary = stats.summary()
+    avg, mn, mx = fmt(summary["mean"]), fmt(summary["min"]), fmt(summary["max"])
+    p50, p95, p99, sd = fmt(summary["p50"]), fmt(summary["p95"]), fmt(summary["p99"]), fmt(summary["std"])
+    status_line = " &nbsp;·&nbsp; ".join(
+        f"{htmllib.escape(k)}: {v}" for k, v in sorted(summary["status_counts"].items(), key=lambda kv: -kv[1])
+    ) or "—"
+    last_merkle = audit_last.get("merkle_root") if audit_last else ""
+    audit_ts = audit_last.get("timestamp") if audit_last else ""
+    spark = make_sparkline_svg(spark_series.values, w=480, h=60) if spark_series.values else ""
+    pager = _pager_html(out_path, 1, page is not None)
 
     # HTML template (kept simple, dark theme)
-    html_content = f"""<!doctype html>
+    out.write(f"""<!doctype html>
 <html lang="sk">
 <head>
 <meta charset="utf-8"/>
 <meta name="viewport" content="width=device-width,initial-scale=1"/>
 <title>Axiomatic Intelligence — Report</title>
 <style>
-:root{{--bg:#0f1720;--card:#111827;--muted:#94a3b8;--accent:#9ad0f5;--glass:rgba(255,255,255,0.03)}}
-body{{margin:0;font-family:system-ui, -apple-system, "Segoe UI", Roboto,"Helvetica Neue",Arial; background:var(--bg); color:#e6eef8}}
-.container{{max-width:1100px;margin:18px auto;padding:18px}}
-.header{{display:flex;justify-content:space-between;align-items:center;gap:12px}}
-.card{{background:var(--card);padding:14px;border-radius:12px;box-shadow:0 6px 18px rgba(0,0,0,0.6)}}
-.h1{{font-size:20px;margin:0;color:#fff}}
-.meta{{color:var(--muted);font-size:13px}}
-.grid{{display:grid;grid-template-columns:1fr 320px;gap:14px;margin-top:14px}}
-.summary{{display:flex;flex-direction:column;gap:10px}}
-.metrics{{display:flex;gap:12px}}
-.metric{{background:var(--glass);padding:10px;border-radius:8px;min-width:120px;text-align:center}}
-.metric .val{{font-weight:800;font-size:18px;color:#fff}}
-.table-wrap{{margin-top:14px;overflow:auto;border-radius:8px;box-shadow:0 6px 20px rgba(0,0,0,0.6)}}
-table{{width:100%;border-collapse:collapse}}
-th,td{{padding:8px 10px;text-align:left;border-bottom:1px solid rgba(255,255,255,0.03);font-size:13px}}
-th{{color:var(--muted);font-weight:600;font-size:12px}}
-.badge{{padding:6px 8px;border-radius:999px;font-weight:700;font-size:12px}}
-.footer{{margin-top:18px;color:var(--muted);font-size:13px;display:flex;justify-content:space-between;align-items:center}}
-.small{{font-size:12px;color:var(--muted)}}
-.code{{font-family:monospace;background:rgba(255,255,255,0.02);padding:6px;border-radius:6px}}
-</style>
+{_CSS}</style>
 </head>
 <body>
 <div class="container">
@@ -234,8 +326,11 @@ th{{color:var(--muted);font-weight:600;font-size:12px}}
         <div style="text-align:right">
           <div class="small">min: {mn}</div>
           <div class="small">max: {mx}</div>
+          <div class="small">std: {sd}</div>
         </div>
       </div>
+      <div class="small">p50: {p50} &nbsp;·&nbsp; p95: {p95} &nbsp;·&nbsp; p99: {p99}</div>
+      <div class="small">Statusy: {status_line}</div>
 
       <div style="margin-top:8px">{spark}</div>
 
@@ -266,10 +361,13 @@ th{{color:var(--muted);font-weight:600;font-size:12px}}
         <table>
           <thead><tr>{''.join(f'<th>{htmllib.escape(c)}</th>' for c in visible_cols)}</tr></thead>
           <tbody>
-          {table_rows_html}
-          </tbody>
+""")
+    for i in range(0, len(first_page), 1000):
+        out.write("".join(first_page[i:i + 1000]))
+    out.write(f"""          </tbody>
         </table>
       </div>
+      {pager}
     </div>
   </div>
 
@@ -284,31 +382,55 @@ th{{color:var(--muted);font-weight:600;font-size:12px}}
 </div>
 </body>
 </html>
-"""
-    return html_content
+""")
+    return count
+
+def generate_html(rows: List[Dict[str, str]], fieldnames: List[str], audit_last: Optional[Dict[str, Any]]) -> str:
+    """Celý report ako jeden reťazec (jedna stránka, bez stránkovania)."""
+    buf = io.StringIO()
+    fieldnames = fieldnames or (list(rows[0].keys()) if rows else [])
+    write_report(rows, fieldnames, audit_last, buf, page_size=None)
+    return buf.getvalue()
 
 # --- main ----------------------------------------------------------------
 
+def write_columnar_report(data_file: str, audit_last: Optional[Dict[str, Any]]) -> int:
+    """Report z Parquet / Arrow: memory-mapped, číta iba stĺpce z report_columns."""
+    cols = report_columns(column_names(data_file))
+    tmp = OUT_HTML + ".tmp"
+    with open(tmp, "w", encoding='utf-8') as out:
+        rows = write_report(iter_rows(data_file, columns=cols), cols, audit_last, out, out_path=OUT_HTML)
+    os.replace(tmp, OUT_HTML)
+    return rows
+
 def main():
-    # pick data file (prefer explicit AAV)
+    # pick data file (prefer columnar, then explicit AAV)
+    columnar = next((p for p in DATA_COLUMNAR if os.path.exists(p)), None) if pa is not None else None
     data_file = DATA_WITH_AAV if os.path.exists(DATA_WITH_AAV) else (DATA_RAW if os.path.exists(DATA_RAW) else None)
-    if not data_file:
+    if not data_file and not columnar:
         print("Nenájdené data/rozhodnutia_with_aav.csv ani data/rozhodnutia.csv. Umiestni ich do data/ a skúšaj znova.", file=sys.stderr)
         return
 
-    rows, fieldnames = read_csv(data_file)
-    if not rows:
-        print("Data súbor je prázdny.", file=sys.stderr)
-        return
-
     audit_last = last_audit_entry(AUDIT_LOG)
-    html_text = generate_html(rows, fieldnames, audit_last)
-
     os.makedirs(os.path.dirname(OUT_HTML), exist_ok=True)
-    with open(OUT_HTML, "w", encoding='utf-8') as f:
-        f.write(html_text)
-
-    print("Report vygenerovaný:", OUT_HTML)
+    if columnar:
+        rows = write_columnar_report(columnar, audit_last)
+        print(f"Report vygenerovaný: {OUT_HTML} ({rows} riadkov, {os.path.basename(columnar)})")
+        print("Otvoriť v telefóne (Termux): termux-open", OUT_HTML)
+        return
+    # streamovane: CSV sa nečíta celé do pamäte
+    with open(data_file, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        first = next(reader, None)
+        if first is None:
+            print("Data súbor je prázdny.", file=sys.stderr)
+            return
+        tmp = OUT_HTML + ".tmp"
+        with open(tmp, "w", encoding='utf-8') as out:
+            rows = write_report(itertools.chain([first], reader), reader.fieldnames or [], audit_last, out, out_path=OUT_HTML)
+        os.replace(tmp, OUT_HTML)
+
+    print(f"Report vygenerovaný: {OUT_HTML} ({rows} riadkov)")
     print("Otvoriť v telefóne (Termux): termux-open", OUT_HTML)
 
 if __name__ == "__main__":
@@ -6,49 +6,233 @@ AI scoring pipeline:
 - run scorer (sklearn model / dummy)
 - calibrate (Isotonic/Platt) if calibrator provided
 - combine with AAV and return final decision
-- log canonical JSON (for Merkle anchoring later)
+- log canonical JSON (for Merkle anchoring later): one file per decision,
+  or a segmented append-only log (decision_log.SegmentedLogWriter)
 """
 import os
-import json
 import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from joblib import load
-
-# Try to import sentence-transformers; fallback to simple stub
-try:
-    from sentence_transformers import SentenceTransformer
-    EMB_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-except Exception:
-    EMB_MODEL = None
 
 from compute_aav import compute_aav
+from decision_log import canonical_json
+from embedding_cache import EmbeddingCache
+
+EMB_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+class MicroBatchEmbedder:
+    """
+    Dynamic micro-batching for a batch encoder (e.g. SentenceTransformer.encode).
+    Concurrent callers enqueue texts; one worker thread flushes a batch when it
+    has max_batch texts or max_wait seconds after its first text arrived, so the
+    added latency per call is bounded by max_wait.
+    """
+
+    def __init__(self, encode_many, max_batch=64, max_wait=0.002):
+        self.encode_many = encode_many
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self._worker = threading.Thread(target=self._run, name="emb-microbatch", daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        fut = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def embed(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            texts = [t for t, _ in batch]
+            try:
+                vecs = self.encode_many(texts)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, fut), vec in zip(batch, vecs):
+                fut.set_result(vec)
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "mean_batch": (self.items / self.batches) if self.batches else 0.0}
 
-def canonical_json(obj):
-    return json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+class EmbeddingProvider:
+    """
+    Lazily loaded, thread-safe sentence-transformers model.
+    Nothing heavy (torch, model weights) is imported until the first get();
+    if sentence-transformers is unavailable, get() returns None (hash fallback).
+    """
+
+    def __init__(self, model_name=EMB_MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._loaded = False
+        self._batcher = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(self.model_name)
+                    except Exception:
+                        self._model = None
+                    self._loaded = True
+        return self._model
+
+    def batcher(self):
+        """Shared MicroBatchEmbedder over the model (None without a model)."""
+        model = self.get()
+        if model is not None and self._batcher is None:
+            with self._lock:
+                if self._batcher is None:
+                    self._batcher = MicroBatchEmbedder(model.encode)
+        return self._batcher
+
+EMBEDDINGS = EmbeddingProvider()
+
+def warm_up():
+    """Load the embedding model now (for servers, before taking traffic). Returns True if a model is available."""
+    return EMBEDDINGS.get() is not None
+
+# Fallback hash embedding mode: by default only the first `dim` UTF-8 bytes are
+# used (historic behaviour); AXIOM_HASH_EMB_FULL_TEXT=1 folds the whole text.
+HASH_EMB_FULL_TEXT = os.environ.get("AXIOM_HASH_EMB_FULL_TEXT") == "1"
+
+def hash_text_embedding_batch(texts, dim=64, full_text=False):
+    """
+    Vectorized fallback embedding for a batch of texts: byte i of a text adds
+    (byte % 127) / 127 to bucket i % dim.
+    full_text=False uses the first `dim` bytes only (identical to the former
+    per-byte loop); full_text=True folds every byte via one bincount.
+    """
+    n = len(texts)
+    if not full_text:
+        buf = b"".join(t.encode('utf8')[:dim].ljust(dim, b"\0") for t in texts)
+        m = np.frombuffer(buf, dtype=np.uint8).reshape(n, dim)
+        return (m % 127) / 127.0
+    encoded = [t.encode('utf8') for t in texts]
+    lens = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    b = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    rows = np.repeat(np.arange(n), lens)
+    pos = np.arange(b.size) - np.repeat(np.cumsum(lens) - lens, lens)
+    flat = np.bincount(rows * dim + pos % dim, weights=(b % 127) / 127.0, minlength=n * dim)
+    return flat.reshape(n, dim)
 
 def simple_text_embedding(text, dim=64):
-    if EMB_MODEL:
-        return EMB_MODEL.encode(text).astype(float)
-    arr = np.zeros(dim, dtype=float)
-    for i, ch in enumerate(text.encode('utf8')[:dim]):
-        arr[i % dim] += (ch % 127) / 127.0
-    return arr
-
-def featurize(decision_record, weights):
-    aav = compute_aav(weights, decision_record.get("scores", []))
+    batcher = EMBEDDINGS.batcher()
+    if batcher:
+        # single calls from concurrent threads are encoded together
+        return np.asarray(batcher.embed(text), dtype=float)
+    return hash_text_embedding_batch([text], dim, full_text=HASH_EMB_FULL_TEXT)[0]
+
+def simple_text_embedding_batch(texts, dim=64):
+    model = EMBEDDINGS.get()
+    if model:
+        return np.asarray(model.encode(list(texts)), dtype=float)
+    return hash_text_embedding_batch(list(texts), dim, full_text=HASH_EMB_FULL_TEXT)
+
+# Embedding cache used by featurize: AXIOM_EMB_CACHE_BYTES bounds the in-process
+# LRU, AXIOM_EMB_CACHE_DIR enables the shared on-disk tier for worker processes.
+EMBEDDING_CACHE = EmbeddingCache(
+    max_bytes=int(os.environ.get("AXIOM_EMB_CACHE_BYTES", 64 << 20)),
+    disk_path=os.environ.get("AXIOM_EMB_CACHE_DIR") or None,
+)
+
+def embedding_model_id(dim=64):
+    if EMBEDDINGS.get():
+        return EMBEDDINGS.model_name
+    return f"hash-full-{dim}" if HASH_EMB_FULL_TEXT else f"hash-fallback-{dim}"
+
+def embed_texts(texts, dim=64):
+    """Cached embeddings for a list of texts (rows of a float matrix)."""
+    if not texts:
+        return np.zeros((0, dim))
+    return EMBEDDING_CACHE.get_many(texts, embedding_model_id(dim), lambda ts: simple_text_embedding_batch(ts, dim))
+
+def embed_text(text, dim=64):
+    return EMBEDDING_CACHE.get(text, embedding_model_id(dim), lambda t: simple_text_embedding(t, dim))
+
+def featurize(decision_record, weights, aav=None):
+    """aav: optional precomputed compute_aav(weights, scores) (e.g. shared by the execution guard)."""
+    if aav is None:
+        aav = compute_aav(weights, decision_record.get("scores", []))
     sap = float(np.mean(decision_record.get("scores", []))) if decision_record.get("scores") else aav
     text = decision_record.get("reason", "")[:4000]
-    emb = simple_text_embedding(text)
+    emb = embed_text(text)
     numeric = np.array([aav, sap, decision_record.get("delta_aav", 0.0)])
     features = np.concatenate([numeric, emb])
     meta = {"aav": aav, "sap": sap}
     return features, meta
 
+def featurize_batch(decision_records, weights):
+    """
+    Feature matrix for N records (one row per record, same layout as featurize).
+    Records whose scores match len(weights) are scored as one C-contiguous matrix
+    (row sums reduce exactly like compute_aav); others go through featurize.
+    Returns (features, aav, sap) as arrays.
+    """
+    n = len(decision_records)
+    w = np.asarray(weights, dtype=float)
+    aav = np.zeros(n)
+    sap = np.zeros(n)
+    scores = [r.get("scores", []) for r in decision_records]
+    rows = [i for i, sc in enumerate(scores) if len(sc) == len(w) and len(sc) > 0]
+    if rows:
+        S = np.ascontiguousarray([scores[i] for i in rows], dtype=float)
+        denom = np.sum(w)
+        num = np.sum(w * S, axis=1)
+        aav[rows] = num / denom if denom != 0 else 0.0
+        sap[rows] = np.mean(S, axis=1)
+    vectorized = set(rows)
+    for i, rec in enumerate(decision_records):
+        if i not in vectorized:
+            _, meta = featurize(rec, weights)
+            aav[i], sap[i] = meta["aav"], meta["sap"]
+    delta = np.array([r.get("delta_aav", 0.0) for r in decision_records], dtype=float)
+    emb = embed_texts([r.get("reason", "")[:4000] for r in decision_records])
+    features = np.column_stack([aav, sap, delta, emb]) if n else np.zeros((0, 3 + emb.shape[1]))
+    return features, aav, sap
+
 def load_model(path):
+    # sklearn / joblib are imported here, not at module import time
     if path and os.path.exists(path):
+        from joblib import load
         return load(path)
+    from sklearn.linear_model import LogisticRegression
     model = LogisticRegression()
     return model
 
@@ -60,16 +244,41 @@ def ai_predict(model, features):
         v = float(np.tanh(np.mean(features)) * 0.5 + 0.5)
         return v
 
+def ai_predict_batch(model, features):
+    try:
+        return np.asarray(model.predict_proba(features)[:, 1], dtype=float)
+    except Exception:
+        return np.tanh(np.mean(features, axis=1)) * 0.5 + 0.5
+
 def calibrate_score(calibrator, raw_score):
     try:
         return float(calibrator.transform([raw_score])[0])
     except Exception:
         return raw_score
 
+def calibrate_scores(calibrator, raw_scores):
+    try:
+        return np.asarray(calibrator.transform(raw_scores), dtype=float)
+    except Exception:
+        return raw_scores
+
 def combine_scores(aav, ai_score, alpha=0.7):
     return float(alpha * aav + (1.0 - alpha) * ai_score)
 
-def log_decision(logdir, record):
+def combine_scores_batch(aav, ai_scores, alpha=0.7):
+    return alpha * np.asarray(aav, dtype=float) + (1.0 - alpha) * np.asarray(ai_scores, dtype=float)
+
+def decide_actions(final_scores):
+    return np.where(final_scores < 0.5, "REJECT", np.where(final_scores < 0.7, "REVIEW", "ACCEPT"))
+
+def log_decision(logdir, record, writer=None):
+    """
+    Log a decision record; returns (location, sha256).
+    writer: optional decision_log.SegmentedLogWriter (location = "segment#offset");
+    otherwise one JSON file per decision is written to logdir.
+    """
+    if writer is not None:
+        return writer.append(record)
     os.makedirs(logdir, exist_ok=True)
     ts = datetime.utcnow().isoformat() + "Z"
     record["_logged_at"] = ts
@@ -80,9 +289,10 @@ def log_decision(logdir, record):
         f.write(j)
     return fname, h
 
-def process_decision(decision_record, model=None, calibrator=None, weights=None, alpha=0.7, logdir="./logs"):
+def evaluate_decision(decision_record, model=None, calibrator=None, weights=None, alpha=0.7, aav=None):
+    """Score a decision without logging it; returns the record process_decision logs."""
     weights = weights or [1.0]*8
-    features, meta = featurize(decision_record, weights)
+    features, meta = featurize(decision_record, weights, aav=aav)
     ai_raw = ai_predict(model, features)
     ai_cal = calibrate_score(calibrator, ai_raw)
     final = combine_scores(meta["aav"], ai_cal, alpha=alpha)
@@ -103,9 +313,52 @@ def process_decision(decision_record, model=None, calibrator=None, weights=None,
         "scores": decision_record.get("scores", []),
         "meta": decision_record.get("meta", {}),
     }
-    fname, h = log_decision(logdir, out)
+    return out
+
+def process_decision(decision_record, model=None, calibrator=None, weights=None, alpha=0.7, logdir="./logs", log_writer=None):
+    out = evaluate_decision(decision_record, model=model, calibrator=calibrator, weights=weights, alpha=alpha)
+    fname, h = log_decision(logdir, out, writer=log_writer)
     return out, fname, h
 
+def evaluate_decision_batch(decision_records, model=None, calibrator=None, weights=None, alpha=0.7):
+    """
+    Batch variant of evaluate_decision: one feature matrix, one predict_proba,
+    one calibrator transform, vectorized combine / thresholds. No logging.
+    """
+    weights = weights or [1.0]*8
+    records = list(decision_records)
+    features, aav, _ = featurize_batch(records, weights)
+    ai_raw = ai_predict_batch(model, features)
+    ai_cal = calibrate_scores(calibrator, ai_raw)
+    final = combine_scores_batch(aav, ai_cal, alpha=alpha)
+    actions = decide_actions(final)
+    outs = []
+    for i, rec in enumerate(records):
+        outs.append({
+            "decision_id": rec.get("id"),
+            "aav": float(aav[i]),
+            "ai_raw": float(ai_raw[i]),
+            "ai_calibrated": float(ai_cal[i]),
+            "final_score": float(final[i]),
+            "action": str(actions[i]),
+            "reason": rec.get("reason", ""),
+            "scores": rec.get("scores", []),
+            "meta": rec.get("meta", {}),
+        })
+    return outs
+
+def process_decision_batch(decision_records, model=None, calibrator=None, weights=None, alpha=0.7, logdir="./logs", log_writer=None):
+    """
+    Batch variant of process_decision (evaluate_decision_batch + bulk logging).
+    Returns [(out, location, sha256)] in input order, matching process_decision.
+    """
+    outs = evaluate_decision_batch(decision_records, model=model, calibrator=calibrator, weights=weights, alpha=alpha)
+    if log_writer is not None:
+        logged = log_writer.append_many(outs)
+    else:
+        logged = [log_decision(logdir, out) for out in outs]
+    return [(out, loc, h) for out, (loc, h) in zip(outs, logged)]
+
 if __name__ == "__main__":
     demo = {
         "id": "demo-001",
@@ -4,33 +4,256 @@ Simple Merkle root helper for batch anchoring.
 """
 import hashlib
 import json
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+DIGEST_SIZE = 32
+HASH_CHUNK = 1 << 20  # large files are hashed in bounded 1 MiB reads
+
 def sha256_hex(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h
+
 def canonical_hash_of_file(path: Path) -> str:
-    data = path.read_bytes()
-    return sha256_hex(data)
+    return _file_sha256(path).hexdigest()
+
+def canonical_digest_of_file(path: Path) -> bytes:
+    return _file_sha256(path).digest()
+
+def sorted_dir_entries(logdir):
+    """Regular files of logdir (os.DirEntry), sorted by name for a deterministic leaf order."""
+    with os.scandir(logdir) as it:
+        entries = [e for e in it if e.is_file()]
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+def sorted_dir_files(logdir):
+    return [e.path for e in sorted_dir_entries(logdir)]
+
+def iter_file_hashes(paths, compact=False, workers=None):
+    """
+    Hash files in a thread pool (I/O bound) and yield results in input order.
+    At most workers * 16 hashes are in flight, so memory does not grow with len(paths).
+    """
+    fn = canonical_digest_of_file if compact else canonical_hash_of_file
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    if workers <= 1:
+        yield from map(fn, paths)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(fn, path))
+            if len(pending) >= workers * 16:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def node_hash(left: str, right: str) -> str:
+    """Hex-compatible node: sha256 of the two concatenated hex strings."""
+    return sha256_hex((left + right).encode())
+
+def node_digest(left, right) -> bytes:
+    """Compact node: sha256 over the 64 raw bytes left || right."""
+    h = hashlib.sha256(left)
+    h.update(right)
+    return h.digest()
+
+class MerkleAccumulator:
+    """
+    Incremental Merkle root builder with O(log n) memory.
+
+    Leaves are added one at a time; the accumulator keeps only a stack of
+    pending perfect-subtree roots. root() yields the same value as hashing full
+    levels with the duplicate-last-node rule for odd levels.
+
+    Default (hex) mode takes hex digests and reproduces existing roots;
+    compact=True takes raw 32-byte digests and returns a raw 32-byte root.
+    """
+
+    def __init__(self, compact=False):
+        self._stack = []  # [(level, node)], levels strictly decreasing
+        self._node = node_digest if compact else node_hash
+        self.count = 0
+
+    def add(self, leaf: str):
+        node, level = leaf, 0
+        while self._stack and self._stack[-1][0] == level:
+            _, left = self._stack.pop()
+            node = self._node(left, node)
+            level += 1
+        self._stack.append((level, node))
+        self.count += 1
+
+    def extend(self, leaves):
+        for leaf in leaves:
+            self.add(leaf)
+        return self
+
+    def frontier(self):
+        """Pending subtree roots as [[level, node], ...] (hex mode: JSON-serializable)."""
+        return [[level, node] for level, node in self._stack]
+
+    @classmethod
+    def from_frontier(cls, frontier, count, compact=False):
+        """Resume an accumulator from frontier() and its leaf count."""
+        acc = cls(compact=compact)
+        acc._stack = [(int(level), node) for level, node in frontier]
+        acc.count = count
+        return acc
+
+    def root(self):
+        if not self._stack:
+            return None
+        level, node = self._stack[-1]
+        for left_level, left in reversed(self._stack[:-1]):
+            # odd node on a level is paired with itself until it meets its left sibling
+            while level < left_level:
+                node = self._node(node, node)
+                level += 1
+            node = self._node(left, node)
+            level += 1
+        return node
 
 def merkle_root_from_hashes(hashes):
-    if not hashes:
+    return MerkleAccumulator().extend(hashes).root()
+
+def merkle_root_from_digest_buffer(buf):
+    """
+    Compact Merkle root over a contiguous buffer of concatenated 32-byte leaf
+    digests. Levels are hashed in place inside one bytearray; every node input
+    is a 64-byte memoryview slice, so no intermediate str/bytes are built.
+    Returns the raw 32-byte root (None for an empty buffer).
+    """
+    data = bytearray(buf)
+    if len(data) % DIGEST_SIZE:
+        raise ValueError("buffer length must be a multiple of 32")
+    n = len(data) // DIGEST_SIZE
+    if n == 0:
         return None
-    cur = list(hashes)
-    while len(cur) > 1:
-        new = []
-        for i in range(0, len(cur), 2):
-            h1 = cur[i]
-            h2 = cur[i+1] if i+1 < len(cur) else cur[i]
-            new.append(sha256_hex((h1 + h2).encode()))
-        cur = new
-    return cur[0]
-
-def merkle_root_from_dir(logdir):
-    p = Path(logdir)
-    files = sorted([f for f in p.iterdir() if f.is_file()])
-    hashes = [canonical_hash_of_file(f) for f in files]
-    return merkle_root_from_hashes(hashes)
+    mv = memoryview(data)
+    sha = hashlib.sha256
+    while n > 1:
+        pairs = n // 2
+        for i in range(pairs):
+            off = 2 * i * DIGEST_SIZE
+            data[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] = sha(mv[off:off + 2 * DIGEST_SIZE]).digest()
+        if n % 2:
+            last = mv[(n - 1) * DIGEST_SIZE:n * DIGEST_SIZE]
+            data[pairs * DIGEST_SIZE:(pairs + 1) * DIGEST_SIZE] = node_digest(last, last)
+            pairs += 1
+        n = pairs
+    return bytes(mv[:DIGEST_SIZE])
+
+RACY_WINDOW_NS = 2_000_000_000  # files modified this recently are not cached
+
+class LeafHashCache:
+    """
+    Persistent sidecar (SQLite) of file digests keyed by name, size, mtime_ns
+    and inode. Log files are write-once, so an unchanged stat means the cached
+    digest can be reused. Keep the cache file outside the anchored directory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leaves ("
+            "name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, digest BLOB)"
+        )
+
+    def load(self):
+        rows = self.conn.execute("SELECT name, size, mtime_ns, inode, digest FROM leaves")
+        return {name: ((size, mtime_ns, inode), digest) for name, size, mtime_ns, inode, digest in rows}
+
+    def update(self, rows, removed=()):
+        """rows: [(name, (size, mtime_ns, inode), digest)]"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO leaves (name, size, mtime_ns, inode, digest) VALUES (?, ?, ?, ?, ?)",
+                [(name, *key, digest) for name, key, digest in rows],
+            )
+            self.conn.executemany("DELETE FROM leaves WHERE name = ?", [(name,) for name in removed])
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _stat_key(entry):
+    st = entry.stat()
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+def anchor_dir(logdir, cache_path=None, compact=False, workers=None, verify_cache=False):
+    """
+    Merkle root of a log directory, reusing cached leaf digests for files whose
+    (size, mtime_ns, inode) did not change. verify_cache=True rehashes every file
+    and reports files whose content differs from the cached digest although
+    their stat is unchanged (tampering).
+    Returns {"root", "files", "hashed", "cached", "mismatches"}.
+    """
+    scan_start = time.time_ns()
+    entries = sorted_dir_entries(logdir)
+    cache = LeafHashCache(cache_path) if cache_path else None
+    try:
+        cached = cache.load() if cache else {}
+        keys = [_stat_key(e) for e in entries]
+        hits = [None] * len(entries)
+        if not verify_cache:
+            for i, e in enumerate(entries):
+                c = cached.get(e.name)
+                if c is not None and c[0] == keys[i]:
+                    hits[i] = c[1]
+        misses = [e.path for e, h in zip(entries, hits) if h is None]
+        fresh = iter_file_hashes(misses, compact=True, workers=workers)
+
+        acc = MerkleAccumulator(compact=compact)
+        updates, mismatches = [], []
+        for i, e in enumerate(entries):
+            digest = hits[i]
+            if digest is None:
+                digest = next(fresh)
+                c = cached.get(e.name)
+                if c is not None and c[0] == keys[i] and c[1] != digest:
+                    # keep the trusted digest so the mismatch stays reported
+                    mismatches.append(e.name)
+                elif keys[i][1] < scan_start - RACY_WINDOW_NS:
+                    updates.append((e.name, keys[i], digest))
+            acc.add(digest if compact else digest.hex())
+        if cache:
+            present = {e.name for e in entries}
+            cache.update(updates, removed=[name for name in cached if name not in present])
+    finally:
+        if cache:
+            cache.close()
+    root = acc.root()
+    return {
+        "root": root.hex() if compact and root is not None else root,
+        "files": len(entries),
+        "hashed": len(misses),
+        "cached": len(entries) - len(misses),
+        "mismatches": mismatches,
+    }
+
+def merkle_root_from_dir(logdir, compact=False, workers=None, cache_path=None):
+    return anchor_dir(logdir, cache_path=cache_path, compact=compact, workers=workers)["root"]
 
 if __name__ == "__main__":
     print("Merkle root helper ready")
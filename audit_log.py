@@ -0,0 +1,575 @@
+# audit_log.py
+"""
+Append-only audit log (JSONL) writer with group commit.
+
+AuditLogWriter keeps one O_APPEND descriptor open and buffers encoded lines;
+a batch is written with a single os.write under an exclusive flock, so lines
+from concurrent threads and processes never interleave. Batches are committed
+every `flush_every` entries and/or at most `flush_interval` seconds after
+an entry was buffered (a background timer, so an idle writer still commits),
+and on flush() / close() / interpreter exit; fsync=True also fsyncs each batch.
+
+Hash chain: every entry written by AuditLogWriter carries prev_hash (hash of
+the previous line; GENESIS_HASH for the first) and entry_hash = sha256 of its
+canonical JSON without entry_hash. Every `checkpoint_every` entries a
+checkpoint record (action "checkpoint") stores the line count, the running
+Merkle root over all previous line hashes and the accumulator frontier.
+verify_audit_log() checks the chain and checkpoints and remembers the last
+verified checkpoint in <log>.verified, so re-verification only reads lines
+appended after it. Lines written before chaining (no entry_hash) are hashed
+the same way and accepted as an unchained prefix. A torn last line left by a
+writer that died mid-batch is truncated by the next writer (under the lock).
+
+Reading: tail_entries() reads the last N entries by seeking backwards from
+the end; AuditLogIndex keeps a sparse side index (<log>.idx, JSONL) with one
+record per block of INDEX_STRIDE lines - first line number, byte range,
+timestamp range and set of actions - so time-range and action queries only
+parse the blocks that can match, and index maintenance only scans new lines.
+"""
+import atexit
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+from anchor import MerkleAccumulator
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: only in-process locking
+    fcntl = None
+
+GENESIS_HASH = "0" * 64
+CHECKPOINT_EVERY = 1024
+
+def encode_entry(entry):
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+def entry_hash(entry):
+    """sha256 (hex) of the canonical JSON of an entry without its entry_hash field."""
+    body = {k: v for k, v in entry.items() if k != "entry_hash"}
+    j = json.dumps(body, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(j.encode("utf-8")).hexdigest()
+
+def _line_hash(raw):
+    entry = _parse_line(raw)
+    if entry is None:
+        return hashlib.sha256(raw.rstrip(b"\n")).hexdigest()
+    return entry.get("entry_hash") or entry_hash(entry)
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+def _is_checkpoint(entry):
+    return entry.get("action") == "checkpoint" and "merkle_root" in entry and "frontier" in entry
+
+class AuditLogWriter:
+    """
+    Thread- and process-safe buffered appender; use as a context manager or call close().
+    A buffered entry is committed after flush_every entries or, at the latest,
+    flush_interval seconds after it was appended (background timer); writers
+    still open at interpreter exit are flushed.
+    """
+
+    def __init__(self, path, flush_every=64, flush_interval=1.0, fsync=False, checkpoint_every=CHECKPOINT_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.checkpoint_every = checkpoint_every
+        log_dir = os.path.dirname(path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        # chain state, valid while the file size is what this writer left it at
+        self._size = None
+        self._last_hash = GENESIS_HASH
+        self._acc = MerkleAccumulator()
+        self._since_checkpoint = 0
+        self._timer = None
+        _LIVE_WRITERS.add(self)
+
+    def _recover(self, size):
+        """
+        Rebuild chain state from the last checkpoint (or the whole file) under the
+        file lock. A torn last line (a writer died mid-batch) is truncated first:
+        it was never a complete entry and the verifier would reject it.
+        """
+        if size and not tail_ends_with_newline(self.path, size):
+            size = last_line_end(self.path, size)
+            os.ftruncate(self._fd, size)
+        tail = []
+        checkpoint = None
+        with open(self.path, "rb") as f:
+            for raw in _reverse_lines(f, size):
+                entry = _parse_line(raw)
+                if entry is not None and _is_checkpoint(entry):
+                    checkpoint = entry
+                    break
+                tail.append(raw)
+        if checkpoint is not None:
+            acc = MerkleAccumulator.from_frontier(checkpoint["frontier"], checkpoint["count"])
+            acc.add(checkpoint["entry_hash"])
+            last = checkpoint["entry_hash"]
+        else:
+            acc, last = MerkleAccumulator(), GENESIS_HASH
+        for raw in reversed(tail):
+            last = _line_hash(raw)
+            acc.add(last)
+        self._acc, self._last_hash, self._since_checkpoint = acc, last, len(tail)
+
+    def _chain(self, entry):
+        entry.pop("entry_hash", None)
+        entry["prev_hash"] = self._last_hash
+        entry["entry_hash"] = h = entry_hash(entry)
+        self._acc.add(h)
+        self._last_hash = h
+        return encode_entry(entry)
+
+    def _checkpoint(self):
+        return {
+            "timestamp": _utc_now(),
+            "actor": "audit_log",
+            "action": "checkpoint",
+            "count": self._acc.count,
+            "merkle_root": self._acc.root(),
+            "frontier": self._acc.frontier(),
+        }
+
+    def _commit(self):
+        """Chain and write the buffered entries as one batch (caller holds self._lock)."""
+        if self._buffer:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(self._fd).st_size
+                if size != self._size:
+                    self._recover(size)  # first commit, or another writer appended
+                    size = os.fstat(self._fd).st_size
+                lines = []
+                for entry in self._buffer:
+                    lines.append(self._chain(entry))
+                    self._since_checkpoint += 1
+                    if self.checkpoint_every and self._since_checkpoint >= self.checkpoint_every:
+                        lines.append(self._chain(self._checkpoint()))
+                        self._since_checkpoint = 0
+                data = b"".join(lines)
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(self._fd, view):]
+                if self.fsync:
+                    os.fsync(self._fd)
+                self._size = size + len(data)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def append(self, entry):
+        """Buffer one entry (dict; prev_hash / entry_hash are added on commit); returns it."""
+        with self._lock:
+            self._buffer.append(entry)
+            if (self.flush_every and len(self._buffer) >= self.flush_every) or (
+                self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._commit()
+            elif self.flush_interval is not None and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return entry
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if self._fd is not None:
+                self._commit()
+
+    def append_many(self, entries):
+        """Buffer entries and commit them as one batch."""
+        with self._lock:
+            self._buffer.extend(entries)
+            self._commit()
+        return entries
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._commit()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_WRITERS = {}
+_WRITERS_LOCK = threading.Lock()
+_LIVE_WRITERS = weakref.WeakSet()
+
+def audit_writer(path):
+    """
+    Shared unbuffered writer per path (flush_every=1): every append is on disk
+    when it returns, without reopening the file per entry. Closed at exit.
+    """
+    key = os.path.abspath(path)
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = _WRITERS[key] = AuditLogWriter(path, flush_every=1)
+        return writer
+
+@atexit.register
+def _close_writers():
+    # shared writers and any other writer left open: nothing buffered is lost at exit
+    with _WRITERS_LOCK:
+        for writer in _WRITERS.values():
+            writer.close()
+        _WRITERS.clear()
+    for writer in list(_LIVE_WRITERS):
+        writer.close()
+
+# -- reading -------------------------------------------------------------------
+
+INDEX_STRIDE = 1024
+TAIL_BLOCK = 64 * 1024
+
+def parse_timestamp(value):
+    """ISO-8601 timestamp (trailing Z allowed) or datetime -> epoch seconds; None if unparseable."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _parse_line(raw):
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        return None  # malformed lines are skipped, as by the report generators
+    return entry if isinstance(entry, dict) else None
+
+def _reverse_lines(f, end=None):
+    """Non-empty lines of a binary file from `end` (default EOF) backwards, without newlines."""
+    pos = f.seek(0, os.SEEK_END) if end is None else end
+    rest = b""
+    while pos > 0:
+        step = min(TAIL_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + rest).split(b"\n")
+        # the first piece may be the tail of an earlier line: keep it for the next block
+        rest = lines.pop(0)
+        for raw in reversed(lines):
+            if raw.strip():
+                yield raw
+    if rest.strip():
+        yield rest
+
+def tail_ends_with_newline(path, size):
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+def last_line_end(path, size):
+    """Offset just after the last newline before `size` (0 if there is none)."""
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            i = f.read(step).rfind(b"\n")
+            if i >= 0:
+                return pos + i + 1
+    return 0
+
+def tail_entries(path, n=1, checkpoints=False):
+    """
+    Last n entries (oldest first), reading backwards from the end of the file.
+    Checkpoint records of the hash chain are skipped unless checkpoints=True.
+    """
+    if n <= 0 or not os.path.exists(path):
+        return []
+    found = []
+    with open(path, "rb") as f:
+        for raw in _reverse_lines(f):
+            entry = _parse_line(raw)
+            if entry is not None and (checkpoints or not _is_checkpoint(entry)):
+                found.append(entry)
+                if len(found) == n:
+                    break
+    return found[::-1]
+
+def last_entry(path, checkpoints=False):
+    """Last audit entry (by default the last real one, not a chain checkpoint)."""
+    entries = tail_entries(path, 1, checkpoints=checkpoints)
+    return entries[0] if entries else None
+
+class AuditLogIndex:
+    """
+    Sparse block index over an append-only audit log. refresh() (called by
+    the queries) indexes complete blocks appended since the last call; lines
+    after the last complete block are scanned directly.
+    """
+
+    def __init__(self, path, stride=INDEX_STRIDE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.stride = stride
+        self.blocks = []
+
+    def _load(self):
+        blocks = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    blocks.append(json.loads(raw))
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        # a log that shrank or a stride change invalidates the index
+        if blocks and (blocks[-1]["end"] > size or blocks[0]["lines"] != self.stride):
+            blocks = []
+            os.remove(self.index_path)
+        return blocks
+
+    def _scan(self, offset, line, end=None):
+        """Yield (line_no, offset, next_offset, entry or None) for complete lines from offset."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while end is None or offset < end:
+                raw = f.readline()
+                if not raw.endswith(b"\n"):
+                    break  # torn tail of a line being written
+                nxt = offset + len(raw)
+                yield line, offset, nxt, _parse_line(raw) if raw.strip() else None
+                offset, line = nxt, line + 1
+
+    def refresh(self):
+        if not os.path.exists(self.path):
+            self.blocks = []
+            return self
+        blocks = self._load()
+        offset = blocks[-1]["end"] if blocks else 0
+        line = blocks[-1]["line"] + blocks[-1]["lines"] if blocks else 0
+        new, block = [], None
+        for line_no, start, nxt, entry in self._scan(offset, line):
+            if block is None:
+                block = {"line": line_no, "lines": 0, "start": start, "end": start,
+                         "ts_min": None, "ts_max": None, "actions": set()}
+            block["lines"] += 1
+            block["end"] = nxt
+            if entry is not None:
+                ts = parse_timestamp(entry.get("timestamp"))
+                if ts is not None:
+                    block["ts_min"] = ts if block["ts_min"] is None else min(block["ts_min"], ts)
+                    block["ts_max"] = ts if block["ts_max"] is None else max(block["ts_max"], ts)
+                block["actions"].add(str(entry.get("action")))
+            if block["lines"] == self.stride:
+                block["actions"] = sorted(block["actions"])
+                new.append(block)
+                block = None
+        if new:
+            with open(self.index_path, "ab") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                # another process may have indexed the same blocks meanwhile
+                have = os.path.getsize(self.index_path) and self._load()
+                if len(have or []) == len(blocks):
+                    f.write(b"".join((json.dumps(b, sort_keys=True) + "\n").encode() for b in new))
+                    blocks = blocks + new
+                else:
+                    blocks = have
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        self.blocks = blocks
+        return self
+
+    def _tail(self):
+        """(offset, line) where the unindexed tail starts."""
+        if not self.blocks:
+            return 0, 0
+        last = self.blocks[-1]
+        return last["end"], last["line"] + last["lines"]
+
+    def _entries(self, blocks):
+        """Entries of the given blocks followed by the unindexed tail, in log order."""
+        for b in blocks:
+            for _, _, _, entry in self._scan(b["start"], b["line"], b["end"]):
+                if entry is not None:
+                    yield entry
+        offset, line = self._tail()
+        for _, _, _, entry in self._scan(offset, line):
+            if entry is not None:
+                yield entry
+
+    def count(self):
+        """Number of lines (entries incl. malformed ones)."""
+        self.refresh()
+        offset, line = self._tail()
+        return line + sum(1 for _ in self._scan(offset, line))
+
+    def entry_at(self, line_no):
+        """Entry on line line_no (0-based), None if missing or malformed."""
+        self.refresh()
+        i = bisect.bisect_right([b["line"] for b in self.blocks], line_no) - 1
+        if i >= 0 and line_no < self.blocks[i]["line"] + self.blocks[i]["lines"]:
+            start, line, end = self.blocks[i]["start"], self.blocks[i]["line"], self.blocks[i]["end"]
+        else:
+            (start, line), end = self._tail(), None
+        for n, _, _, entry in self._scan(start, line, end):
+            if n == line_no:
+                return entry
+        return None
+
+    def last(self, n=1, checkpoints=False):
+        return tail_entries(self.path, n, checkpoints=checkpoints)
+
+    def between(self, start=None, end=None, checkpoints=False):
+        """
+        Entries with start <= timestamp <= end (ISO strings, datetimes or epoch seconds);
+        checkpoint records only with checkpoints=True.
+        """
+        self.refresh()
+        t0, t1 = parse_timestamp(start), parse_timestamp(end)
+        blocks = [
+            b for b in self.blocks
+            if b["ts_min"] is not None
+            and (t0 is None or b["ts_max"] >= t0)
+            and (t1 is None or b["ts_min"] <= t1)
+        ]
+        for entry in self._entries(blocks):
+            if not checkpoints and _is_checkpoint(entry):
+                continue
+            ts = parse_timestamp(entry.get("timestamp"))
+            if ts is not None and (t0 is None or ts >= t0) and (t1 is None or ts <= t1):
+                yield entry
+
+    def by_action(self, action, limit=None):
+        """Entries with the given action, in log order (at most `limit`); action="checkpoint" lists checkpoints."""
+        self.refresh()
+        blocks = [b for b in self.blocks if str(action) in b["actions"]]
+        found = 0
+        for entry in self._entries(blocks):
+            if str(entry.get("action")) == str(action):
+                yield entry
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+# -- verification ---------------------------------------------------------------
+
+def verify_audit_log(path, state_path=None, full=False):
+    """
+    Verify the hash chain and checkpoints of an audit log.
+
+    Resumes after the last verified checkpoint stored in state_path (default
+    <log>.verified) unless full=True; that checkpoint line itself is re-read
+    and must be unchanged. On success the state moves to the newest verified
+    checkpoint. Returns {"ok", "lines", "resumed_at", "verified", "checkpoints",
+    "root", "error"}; a torn last line (being written) is not counted.
+    """
+    state_path = state_path or path + ".verified"
+    result = {"ok": False, "lines": 0, "resumed_at": 0, "verified": 0, "checkpoints": 0, "root": None, "error": None}
+    if not os.path.exists(path):
+        result["error"] = f"{path} does not exist"
+        return result
+    state = None
+    if not full and os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+    with open(path, "rb") as f:
+        if state is not None:
+            f.seek(state["checkpoint_offset"])
+            raw = f.readline()
+            entry = _parse_line(raw)
+            # the stored entry_hash field alone proves nothing: recompute it from the line
+            if (entry is None or f.tell() != state["offset"] or not _is_checkpoint(entry)
+                    or entry.get("entry_hash") != state["checkpoint_hash"] or entry_hash(entry) != state["checkpoint_hash"]):
+                result["error"] = f"line {state['lines'] - 1}: verified checkpoint was modified"
+                return result
+            acc = MerkleAccumulator.from_frontier(state["frontier"], state["lines"])
+            last, line_no, chained = state["checkpoint_hash"], state["lines"], True
+        else:
+            acc, last, line_no, chained = MerkleAccumulator(), None, 0, False
+        result["resumed_at"] = line_no
+        new_state = None
+        offset = f.tell()
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # torn tail of an entry being written
+            entry = _parse_line(raw) if raw.strip() else None
+            if entry is None:
+                result["error"] = f"line {line_no}: not a JSON object"
+                break
+            h = entry_hash(entry)
+            if "entry_hash" in entry:
+                if entry["entry_hash"] != h:
+                    result["error"] = f"line {line_no}: entry_hash mismatch"
+                    break
+                if entry.get("prev_hash") != (last or GENESIS_HASH):
+                    result["error"] = f"line {line_no}: prev_hash does not match the previous entry"
+                    break
+                chained = True
+            elif chained:
+                result["error"] = f"line {line_no}: unchained entry inside the hash chain"
+                break
+            if chained and _is_checkpoint(entry):
+                if entry["count"] != line_no or entry["merkle_root"] != acc.root():
+                    result["error"] = f"line {line_no}: checkpoint does not match the log before it"
+                    break
+                acc.add(h)
+                result["checkpoints"] += 1
+                new_state = {
+                    "checkpoint_offset": offset,
+                    "offset": offset + len(raw),
+                    "checkpoint_hash": h,
+                    "lines": line_no + 1,
+                    "frontier": acc.frontier(),
+                }
+            else:
+                acc.add(h)
+            last = h
+            line_no += 1
+            offset += len(raw)
+
+    result["lines"] = line_no
+    result["verified"] = line_no - result["resumed_at"]
+    result["root"] = acc.root()
+    if result["error"] is None:
+        result["ok"] = True
+        if new_state is not None:
+            tmp = state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(new_state, f)
+            os.replace(tmp, state_path)
+    return result
@@ -4,21 +4,39 @@
 axiomatic_tool.py
 
 Univerzálny nástroj pre Axiomatic Intelligence:
-- compute-aav: vypočíta AAV pre CSV súbor rozhodnutí
+- compute-aav: vypočíta AAV pre CSV súbor rozhodnutí (voliteľne streamovane po blokoch / paralelne);
+  vstup aj výstup môže byť aj Parquet / Arrow (.parquet, .arrow - podľa prípony, vyžaduje pyarrow)
 - bayes-update: jednoduchá Bayesova aktualizácia váhového parametra
 - gd-update: gradient descent update pre váhy
-- merkle-root: vygeneruje Merkle root zo súboru záznamov (JSONL / CSV)
-- audit-append: pridá auditný záznam do audit/log.jsonl
+- merkle-root: vygeneruje Merkle root zo súboru záznamov (JSONL / CSV / Parquet / Arrow)
+- merkle-append / merkle-proof / merkle-verify: perzistentný Merkle strom a inclusion proofs
+- audit-append: pridá auditný záznam do audit/log.jsonl (hash-reťazený, s checkpointmi)
+- audit-verify: overí hash-reťaz a checkpointy audit logu (inkrementálne od posledného overeného checkpointu)
+- guard-batch: execution guard nad prúdom rozhodnutí (JSONL / segmentovaný log) -> JSONL verdikty
+- dashboard-summary: predpočíta súhrn (sidecar JSON) pre live dashboard namiesto parsovania celého CSV v prehliadači
 
 Použitie:
     python axiomatic_tool.py compute-aav --weights config/weights.json --scores data/rozhodnutia.csv
+    python axiomatic_tool.py compute-aav --weights config/weights.json --scores data/rozhodnutia.csv --chunksize 100000
+    python axiomatic_tool.py compute-aav --weights config/weights.json --scores data/rozhodnutia.csv --workers 32
+    python axiomatic_tool.py compute-aav --weights config/weights.json --scores data/rozhodnutia.csv --output data/rozhodnutia_with_aav.parquet
     python axiomatic_tool.py merkle-root --input data/rozhodnutia.csv
     python axiomatic_tool.py bayes-update --prior 1 1 --success 8 --trials 10
+    python axiomatic_tool.py merkle-append --store anchor/tree --file logs/*.json
+    python axiomatic_tool.py merkle-proof --store anchor/tree --index 3 --output proof.json
+    python axiomatic_tool.py merkle-verify --proof proof.json --root <anchored_root>
+    python axiomatic_tool.py audit-verify --audit audit/log.jsonl
+    python axiomatic_tool.py guard-batch --input decisions.jsonl --output verdicts.jsonl --logdir logs/guard
+    python axiomatic_tool.py dashboard-summary --input data/rozhodnutia_with_aav.csv
 """
 
 import argparse
+import io
 import json
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from hashlib import sha256
 from datetime import datetime, timezone
 import csv
@@ -29,6 +47,15 @@ import numpy as np
 import pandas as pd
 from scipy.stats import beta
 
+from anchor import MerkleAccumulator, anchor_dir
+from audit_log import audit_writer, verify_audit_log
+from columnar import ColumnarWriter, column_names, columnar_format, iter_frames, iter_rows, read_frame, write_frame
+from compute_aav import compute_aav_matrix
+from dashboard_summary import build_summary, summary_path
+from decision_log import GUARD_LOGDIR
+from merkle_store import MerkleTreeStore, verify_proof
+from online_stats import OnlineStats
+
 # -------------------------
 #  Utility / Core functions
 # -------------------------
@@ -72,19 +99,236 @@ def compute_aav_from_lists(weights, scores, biases=None, reciprocities=None):
         raise ZeroDivisionError("Sum of weights is zero")
     return float(numerator / denominator)
 
+AXIOM_KEYS = ['INT', 'LEX', 'WIS', 'REL', 'VER', 'LIB', 'UNI', 'CRE']
+
 def load_weights_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         data = json.load(f)
     # expected keys like INT, LEX, WIS, REL, VER, LIB, UNI, CRE
     return data
 
-def read_scores_csv(path, expected_cols=None):
-    df = pd.read_csv(path)
+def check_expected_columns(columns, expected_cols=None):
     if expected_cols:
-        missing = [c for c in expected_cols if c not in df.columns]
+        missing = [c for c in expected_cols if c not in columns]
         if missing:
             raise ValueError(f"Missing expected columns in CSV: {missing}")
-    return df
+
+def read_scores_csv(path, expected_cols=None):
+    """
+    Celé CSV naraz; typy stĺpcov ako pri iter_scores_csv (skóre float, ostatné text),
+    aby výstup nezávisel od módu (celý súbor / --chunksize / --workers).
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    check_expected_columns(header, expected_cols)
+    return pd.read_csv(path, dtype=_scores_dtype(header, expected_cols))
+
+def read_scores(path, expected_cols=None):
+    """Celý súbor skóre ako DataFrame: CSV alebo Parquet / Arrow (podľa prípony)."""
+    if not columnar_format(path):
+        return read_scores_csv(path, expected_cols=expected_cols)
+    check_expected_columns(column_names(path), expected_cols)
+    return read_frame(path)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+def _scores_dtype(header, expected_cols):
+    score_cols = set(expected_cols or [])
+    return {c: (float if c in score_cols else str) for c in header}
+
+def iter_scores_csv(path, chunksize, expected_cols=None):
+    """
+    Streamované čítanie CSV po blokoch `chunksize` riadkov.
+    Hlavička sa validuje raz; stĺpce skóre sa čítajú ako float, ostatné ako text,
+    aby formát výstupu nezávisel od hraníc blokov.
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    check_expected_columns(header, expected_cols)
+    return pd.read_csv(path, chunksize=chunksize, dtype=_scores_dtype(header, expected_cols))
+
+def iter_scores(path, chunksize, expected_cols=None):
+    """Bloky po `chunksize` riadkov z CSV alebo z Parquet / Arrow (memory-mapped)."""
+    if not columnar_format(path):
+        return iter_scores_csv(path, chunksize, expected_cols=expected_cols)
+    check_expected_columns(column_names(path), expected_cols)
+    return iter_frames(path, chunksize)
+
+class _CsvFrameWriter:
+    """Pripisuje DataFrame bloky do jedného CSV (hlavička iba pri prvom bloku)."""
+
+    def __init__(self, path):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._header = True
+
+    def write(self, df):
+        df.to_csv(self._f, index=False, header=self._header)
+        self._header = False
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_frame_writer(path):
+    """Zapisovač blokov podľa prípony: Parquet / Arrow (columnar.ColumnarWriter) alebo CSV."""
+    return ColumnarWriter(path) if columnar_format(path) else _CsvFrameWriter(path)
+
+def _status_column(columns):
+    return next((c for c in ('Status', 'status') if c in columns), None)
+
+def update_aav_stats(stats, chunk):
+    """Pripočíta AAV (a Status, ak je v CSV) bloku do OnlineStats."""
+    if stats is not None:
+        status_col = _status_column(chunk.columns)
+        stats.add_many(chunk['AAV'].tolist(), chunk[status_col].tolist() if status_col else None)
+
+def compute_aav_csv_chunked(in_path, out_path, cols, weights, chunksize, stats=None):
+    """
+    Vypočíta AAV po blokoch a každý blok hneď pripíše do out_path.
+    Pamäť je ohraničená veľkosťou bloku. Vracia celkový počet riadkov.
+    in_path / out_path môžu byť aj Parquet / Arrow (podľa prípony).
+    stats: voliteľný OnlineStats, doplní sa o AAV všetkých riadkov.
+    """
+    if os.path.abspath(in_path) == os.path.abspath(out_path):
+        raise ValueError("Output file must differ from input file in chunked mode")
+    rows = 0
+    with open_frame_writer(out_path) as out:
+        for chunk in iter_scores(in_path, chunksize, expected_cols=cols):
+            chunk['AAV'] = compute_aav_matrix(weights, chunk[cols])
+            out.write(chunk)
+            update_aav_stats(stats, chunk)
+            rows += len(chunk)
+    return rows
+
+class _ByteRangeReader(io.RawIOBase):
+    """Binárny reader, ktorý z path vidí iba bajty [start, end)."""
+
+    def __init__(self, path, start, end):
+        self._f = open(path, 'rb')
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._left <= 0:
+            return 0
+        n = self._f.readinto(memoryview(b)[:min(len(b), self._left)])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+SCAN_BLOCK = 1 << 20
+
+def csv_record_starts(path, targets):
+    """
+    Pre každý cieľový offset (vzostupne) prvý začiatok CSV záznamu >= cieľ.
+    Nový riadok vo vnútri poľa v úvodzovkách nie je hranica záznamu: parita
+    počtu '"' od začiatku súboru ("" v poli ju nemení). Ciele za posledným
+    záznamom dostanú veľkosť súboru. Jeden sekvenčný prechod súborom.
+    """
+    size = os.path.getsize(path)
+    starts, quoted, pos, t = [], False, 0, 0
+    with open(path, 'rb') as f:
+        while t < len(targets):
+            block = f.read(SCAN_BLOCK)
+            if not block:
+                break
+            i = 0
+            while t < len(targets):
+                if starts and starts[-1] >= targets[t]:
+                    # aj tento cieľ leží pred už nájdeným začiatkom záznamu
+                    starts.append(starts[-1])
+                    t += 1
+                    continue
+                # nový riadok na offsete >= cieľ-1 => záznam začína na >= cieľ
+                nl = block.find(b"\n", max(targets[t] - 1 - pos, i))
+                if nl < 0:
+                    break
+                quoted ^= bool(block.count(b'"', i, nl) & 1)
+                i = nl + 1
+                if not quoted:
+                    starts.append(pos + i)
+                    t += 1
+            quoted ^= bool(block.count(b'"', i) & 1)
+            pos += len(block)
+    return starts + [size] * (len(targets) - len(starts))
+
+def shard_byte_ranges(path, n_shards):
+    """
+    Rozdelí dátovú časť CSV (za hlavičkou) na n_shards bajtových rozsahov
+    zarovnaných na začiatok záznamu (csv_record_starts: pole v úvodzovkách
+    s novým riadkom sa nerozdelí). Vracia zoznam (start, end), prázdne vynechá.
+    """
+    size = os.path.getsize(path)
+    data_start = csv_record_starts(path, [1])[0] if size else 0
+    targets = [data_start + (size - data_start) * i // n_shards for i in range(1, n_shards)]
+    bounds = [data_start]
+    for b in csv_record_starts(path, targets):
+        bounds.append(max(b, bounds[-1]))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def _score_shard(task):
+    """Worker: ohodnotí jeden bajtový rozsah a zapíše ho do part súboru; vracia (riadky, OnlineStats)."""
+    in_path, start, end, header, cols, weights, chunksize, part_path, write_header = task
+    rows = 0
+    stats = OnlineStats()
+    raw = _ByteRangeReader(in_path, start, end)
+    with io.BufferedReader(raw) as src, open(part_path, "w", newline="", encoding="utf-8") as out:
+        reader = pd.read_csv(src, header=None, names=header, chunksize=chunksize,
+                             dtype=_scores_dtype(header, cols), encoding='utf-8')
+        for chunk in reader:
+            chunk['AAV'] = compute_aav_matrix(weights, chunk[cols])
+            chunk.to_csv(out, index=False, header=write_header)
+            write_header = False
+            update_aav_stats(stats, chunk)
+            rows += len(chunk)
+        if write_header:
+            pd.DataFrame(columns=header + ['AAV']).to_csv(out, index=False)
+    return rows, stats
+
+def compute_aav_csv_sharded(in_path, out_path, cols, weights, workers, chunksize=DEFAULT_CHUNKSIZE, stats=None):
+    """
+    Paralelný compute-aav: vstup sa rozdelí na bajtové shardy zarovnané na riadky,
+    každý shard sa ohodnotí v samostatnom procese (po blokoch `chunksize`)
+    a výsledné časti sa spoja v pôvodnom poradí riadkov.
+    Výstup je bajtovo zhodný so sériovým (--chunksize) módom. Vracia počet riadkov.
+    stats: voliteľný OnlineStats; štatistiky shardov sa doň zlúčia (merge).
+    """
+    if os.path.abspath(in_path) == os.path.abspath(out_path):
+        raise ValueError("Output file must differ from input file in sharded mode")
+    header = list(pd.read_csv(in_path, nrows=0).columns)
+    check_expected_columns(header, cols)
+    # viac shardov ako procesov, aby nerovnomerné riadky nebrzdili posledný proces
+    ranges = shard_byte_ranges(in_path, workers * 4) or [(0, 0)]
+    tmpdir = tempfile.mkdtemp(prefix=".aav_shards_", dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        tasks = [
+            (in_path, start, end, header, cols, weights, chunksize,
+             os.path.join(tmpdir, f"part_{i:06d}.csv"), i == 0)
+            for i, (start, end) in enumerate(ranges)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = 0
+            for shard_rows, shard_stats in pool.map(_score_shard, tasks):
+                rows += shard_rows
+                if stats is not None:
+                    stats.merge(shard_stats)
+        with open(out_path, "wb") as out:
+            for task in tasks:
+                with open(task[7], "rb") as part:
+                    shutil.copyfileobj(part, out)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return rows
 
 # -------------------------
 #  Updates: Bayes & GD
@@ -127,54 +371,60 @@ def sha256_hex(s: str) -> str:
 
 def merkle_root_from_hashes(hashes):
     """
-    Rekurzívne vypočíta Merkle root.
-    hashes: list of hex strings.
-    Ak je počet nepárny, duplikuje posledný.
+    Vypočíta Merkle root streamovane (MerkleAccumulator, pamäť O(log n)).
+    hashes: iterovateľné hex stringy (list alebo generátor).
+    Ak je počet na úrovni nepárny, duplikuje posledný.
     """
-    if not hashes:
-        return ''
-    cur = list(hashes)
-    while len(cur) > 1:
-        nxt = []
-        for i in range(0, len(cur), 2):
-            h1 = cur[i]
-            h2 = cur[i+1] if i+1 < len(cur) else cur[i]
-            nxt.append(sha256_hex(h1 + h2))
-        cur = nxt
-    return cur[0]
-
-def merkle_root_from_csv_rows(path, row_to_string=None, max_rows=None):
+    return MerkleAccumulator().extend(hashes).root() or ''
+
+def canonical_row_string(row):
     """
-    Vytvor Merkle root zo CSV riadkov.
-    row_to_string: funkcia, ktorá z riadka (dict) vráti reťazec; default = JSON-like repr cez CSV order.
+    Deterministická serializácia riadka pre Merkle list: "k=v" zoradené podľa kľúča, spojené "|".
+    Hodnoty sú text bunky tak, ako je v CSV (pri Parquet / Arrow columnar.cell_text),
+    takže list nezávisí od formátu uloženia.
     """
-    hashes = []
+    return "|".join(f"{k}={row[k]}" for k in sorted(row.keys()))
+
+def merkle_root_from_rows(rows, row_to_string=None, max_rows=None, compact=False):
+    """
+    Merkle root z iterátora riadkov (dict); listy sa nedržia v pamäti.
+    row_to_string: funkcia, ktorá z riadka vráti reťazec; default = canonical_row_string.
+    compact: binárne 32-bajtové digesty namiesto hex reťazcov (iný, nový formát rootu);
+    default hex mód zachováva kompatibilitu so staršími rootmi.
+    """
+    acc = MerkleAccumulator(compact=compact)
+    to_string = row_to_string or canonical_row_string
+    for idx, row in enumerate(rows):
+        if max_rows and idx >= max_rows:
+            break
+        s = to_string(row)
+        if compact:
+            acc.add(sha256(s.encode('utf-8')).digest())
+        else:
+            acc.add(sha256_hex(s))
+    root = acc.root()
+    if root is None:
+        return ''
+    return root.hex() if compact else root
+
+def merkle_root_from_csv_rows(path, row_to_string=None, max_rows=None, compact=False):
+    """Vytvor Merkle root zo CSV riadkov (pozri merkle_root_from_rows)."""
     with open(path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for idx, row in enumerate(reader):
-            if max_rows and idx >= max_rows:
-                break
-            if row_to_string:
-                s = row_to_string(row)
-            else:
-                # deterministická serializácia: zoradené podľa kľúča
-                keys = sorted(row.keys())
-                parts = []
-                for k in keys:
-                    parts.append(f"{k}={row[k]}")
-                s = "|".join(parts)
-            hashes.append(sha256_hex(s))
-    return merkle_root_from_hashes(hashes)
+        return merkle_root_from_rows(csv.DictReader(csvfile), row_to_string, max_rows, compact)
+
+def merkle_root_from_columnar_rows(path, row_to_string=None, max_rows=None, compact=False):
+    """
+    Merkle root z riadkov Parquet / Arrow súboru; pre rovnaké dáta je zhodný
+    s rootom CSV zapísaného z toho istého DataFrame (pozri canonical_row_string).
+    """
+    return merkle_root_from_rows(iter_rows(path), row_to_string, max_rows, compact)
 
 # -------------------------
 #  Audit log helper
 # -------------------------
 
-def append_audit_log(logpath, actor, action, payload, commit_hash=None, merkle_leaf=None):
-    log_dir = os.path.dirname(logpath)
-    if log_dir:
-        os.makedirs(log_dir, exist_ok=True)
-    entry = {
+def make_audit_entry(actor, action, payload, commit_hash=None, merkle_leaf=None):
+    return {
         "timestamp": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
         "actor": actor,
         "action": action,
@@ -182,10 +432,15 @@ def append_audit_log(logpath, actor, action, payload, commit_hash=None, merkle_l
         "commit_hash": commit_hash or "",
         "merkle_leaf": merkle_leaf or ""
     }
-    # append as JSONL
-    with open(logpath, "a", encoding='utf-8') as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    return entry
+
+def append_audit_log(logpath, actor, action, payload, commit_hash=None, merkle_leaf=None, writer=None):
+    """
+    Pridá záznam do audit logu (JSONL).
+    writer: voliteľný audit_log.AuditLogWriter (group commit); inak zdieľaný
+    writer pre logpath, ktorý zapíše záznam okamžite.
+    """
+    entry = make_audit_entry(actor, action, payload, commit_hash=commit_hash, merkle_leaf=merkle_leaf)
+    return (writer or audit_writer(logpath)).append(entry)
 
 # -------------------------
 #  CLI command implementations
@@ -199,7 +454,6 @@ def cmd_compute_aav(args):
         'Zámer (INT)','Existencia (LEX)','Múdrosť (WIS)','Vzájomnosť (REL)',
         'Pravda (VER)','Sloboda (LIB)','Jednota (UNI)','Tvorba (CRE)'
     ]
-    df = read_scores_csv(args.scores, expected_cols=cols)
     # zostav váhový zoznam v rovnakom poradí
     key_map = {
         'Zámer (INT)': 'INT',
@@ -213,26 +467,54 @@ def cmd_compute_aav(args):
     }
     weights_list = [w.get(key_map.get(c, c), 1.0) for c in cols]
 
-    aavs = []
-    for _, row in df.iterrows():
-        scores = [row[c] for c in cols]
-        aav = compute_aav_from_lists(weights_list, scores)
-        aavs.append(aav)
-    df['AAV'] = aavs
-    out_path = args.output or args.scores.replace('.csv', '_with_aav.csv')
-    df.to_csv(out_path, index=False)
+    base, ext = os.path.splitext(args.scores)
+    out_path = args.output or (base + '_with_aav' + ext if columnar_format(args.scores) else args.scores.replace('.csv', '_with_aav.csv'))
+    columnar = columnar_format(args.scores) or columnar_format(out_path)
+    stats = OnlineStats()
+    if args.workers and args.workers > 1:
+        if columnar:
+            raise ValueError("--workers supports CSV input and output only (use --chunksize for Parquet / Arrow)")
+        # paralelný mód: shardy po procesoch, výstup v pôvodnom poradí
+        rows = compute_aav_csv_sharded(args.scores, out_path, cols, weights_list, args.workers,
+                                       chunksize=args.chunksize or DEFAULT_CHUNKSIZE, stats=stats)
+    elif args.chunksize:
+        # streamovaný mód: pamäť ohraničená veľkosťou bloku
+        rows = compute_aav_csv_chunked(args.scores, out_path, cols, weights_list, args.chunksize, stats=stats)
+    else:
+        df = read_scores(args.scores, expected_cols=cols)
+        df['AAV'] = compute_aav_matrix(weights_list, df[cols])
+        if columnar_format(out_path):
+            write_frame(df, out_path)
+        else:
+            df.to_csv(out_path, index=False)
+        update_aav_stats(stats, df)
+        rows = len(df)
     print(f"[OK] Uloženo: {out_path}")
+    print("AAV štatistiky:", format_aav_stats(stats))
 
     # append audit log entry (payload = summary)
     payload = {
         "input_file": args.scores,
-        "rows": len(df),
+        "rows": rows,
         "weights_used": weights_list,
         "output_file": out_path
     }
     entry = append_audit_log(args.audit or "audit/log.jsonl", args.actor or "cli_user", "compute_aav", payload)
     print("Audit záznam:", entry)
 
+def format_aav_stats(stats):
+    s = stats.summary()
+    if not s["count"]:
+        return "žiadne AAV hodnoty"
+    parts = [f"n={s['count']}", f"mean={s['mean']:.6f}"]
+    if s["std"] is not None:
+        parts.append(f"std={s['std']:.6f}")
+    parts += [f"min={s['min']:.6f}", f"max={s['max']:.6f}",
+              f"p50={s['p50']:.6f}", f"p95={s['p95']:.6f}", f"p99={s['p99']:.6f}"]
+    if s["status_counts"]:
+        parts.append("status=" + ",".join(f"{k}:{v}" for k, v in sorted(s["status_counts"].items())))
+    return " ".join(parts)
+
 def cmd_bayes_update(args):
     updated = bayes_update_weight(args.prior_a, args.prior_b, args.success, args.trials)
     print(f"[OK] Bayes updated mean: {updated:.6f}")
@@ -254,15 +536,66 @@ def cmd_gd_update(args):
         print(f"Saved to {args.output}")
 
 def cmd_merkle_root(args):
-    if args.input.lower().endswith('.csv'):
-        root = merkle_root_from_csv_rows(args.input, max_rows=args.max_rows)
-        print("[OK] Merkle root:", root)
+    if os.path.isdir(args.input):
+        # adresár logov (jeden list = sha256 súboru), voliteľne s cache podľa stat
+        res = anchor_dir(args.input, cache_path=args.cache, compact=args.compact,
+                         workers=args.workers, verify_cache=args.verify_cache)
+        mode = "compact" if args.compact else "hex"
+        print(f"[OK] Merkle root ({mode}):", res["root"])
+        print(f"Súbory: {res['files']} (hashované: {res['hashed']}, z cache: {res['cached']})")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({"merkle_root": res["root"], "mode": mode, "files": res["files"]}, f, ensure_ascii=False, indent=2)
+            print(f"Saved to {args.output}")
+        if res["mismatches"]:
+            raise ValueError(f"Cache nesúhlasí s obsahom (možná manipulácia): {res['mismatches']}")
+    elif args.input.lower().endswith('.csv') or columnar_format(args.input):
+        # listy z kanonickej serializácie riadkov: CSV a Parquet / Arrow s tými istými dátami dajú rovnaký root
+        rows_root = merkle_root_from_columnar_rows if columnar_format(args.input) else merkle_root_from_csv_rows
+        root = rows_root(args.input, max_rows=args.max_rows, compact=args.compact)
+        mode = "compact" if args.compact else "hex"
+        print(f"[OK] Merkle root ({mode}):", root)
         if args.output:
             with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump({"merkle_root": root}, f, ensure_ascii=False, indent=2)
+                json.dump({"merkle_root": root, "mode": mode}, f, ensure_ascii=False, indent=2)
             print(f"Saved to {args.output}")
     else:
-        print("Podporované vstupy: CSV (pre jednoduchý demo mód).")
+        print("Podporované vstupy: CSV / Parquet / Arrow (pre jednoduchý demo mód) alebo adresár logov.")
+
+def cmd_merkle_append(args):
+    # listy: hex digesty alebo súbory (napr. logy z ai_pipeline.log_decision -> sha256 obsahu)
+    leaves = list(args.leaf or [])
+    for path in args.file or []:
+        with open(path, 'rb') as f:
+            leaves.append(sha256(f.read()).hexdigest())
+    if not leaves:
+        raise ValueError("Zadaj aspoň jeden --leaf alebo --file")
+    with MerkleTreeStore(args.store, compact=True if args.compact else None) as store:
+        indices = store.extend(leaves)
+        root = store.root()
+        size = len(store)
+    for idx, leaf in zip(indices, leaves):
+        print(f"[OK] Leaf #{idx}: {leaf}")
+    print(f"[OK] Merkle root (size={size}):", root)
+
+def cmd_merkle_proof(args):
+    with MerkleTreeStore(args.store) as store:
+        proof = store.proof(args.index, size=args.size)
+    text = json.dumps(proof, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"[OK] Proof uložený: {args.output}")
+    else:
+        print(text)
+
+def cmd_merkle_verify(args):
+    with open(args.proof, 'r', encoding='utf-8') as f:
+        proof = json.load(f)
+    # overuje sa voči anchorovanému rootu z --root, nie voči rootu uloženému v proof
+    if not verify_proof(proof, args.root, leaf=args.leaf):
+        raise ValueError("Inclusion proof je NEPLATNÝ")
+    print(f"[OK] Leaf #{proof['leaf_index']} je súčasťou rootu {args.root} (size={proof['tree_size']})")
 
 def cmd_audit_append(args):
     # payload z JSON súboru alebo string
@@ -277,6 +610,84 @@ def cmd_audit_append(args):
     entry = append_audit_log(args.audit or "audit/log.jsonl", args.actor or "cli_user", args.action or "manual", payload, commit_hash=args.commit, merkle_leaf=args.merkle)
     print("[OK] Audit appended:", entry)
 
+def cmd_audit_verify(args):
+    audit = args.audit or "audit/log.jsonl"
+    r = verify_audit_log(audit, state_path=args.state, full=args.full)
+    if not r["ok"]:
+        raise ValueError(f"Audit log je NEPLATNÝ: {r['error']}")
+    print(f"[OK] {audit}: {r['lines']} riadkov, overených {r['verified']} od riadku {r['resumed_at']}, "
+          f"checkpointov {r['checkpoints']}, merkle root {r['root']}")
+
+def iter_decisions(path):
+    """Rozhodnutia z JSONL súboru, stdin ('-') alebo adresára segmentovaného logu."""
+    if os.path.isdir(path):
+        from decision_log import iter_records
+        yield from iter_records(path)
+        return
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def cmd_guard_batch(args):
+    # ai_pipeline / sklearn sa importujú iba pre tento príkaz
+    from ai_pipeline import load_model
+    from decision_log import SegmentedLogWriter
+    from execution_guard import GuardStats, execution_guard_batch
+
+    weights = None
+    if args.weights:
+        w = load_weights_json(args.weights)
+        weights = [w.get(k, 1.0) for k in AXIOM_KEYS] if isinstance(w, dict) else list(w)
+    model = load_model(args.model) if args.model else None
+    calibrator = None
+    if args.calibrator:
+        from joblib import load
+        calibrator = load(args.calibrator)
+
+    from signatures import load_keyring, verification_pool
+    # dôveryhodné kľúče iba z keyringu (--keyring / $AXIOM_KEYRING / config/keyring.json), nikdy z podpisov
+    keyring = load_keyring(args.keyring)
+
+    stats = GuardStats()
+    log_writer = None if args.no_log else SegmentedLogWriter(args.logdir)
+    # jeden pool na overovanie podpisov pre celý beh (nie pre každý chunk)
+    sig_pool = verification_pool(args.workers)
+    out = sys.stdout if not args.output or args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        verdicts = execution_guard_batch(
+            iter_decisions(args.input), model=model, calibrator=calibrator, weights=weights,
+            chunk_size=args.chunk_size, logdir=None, log_writer=log_writer, stats=stats,
+            keyring=keyring, sig_workers=args.workers, sig_pool=sig_pool,
+        )
+        for n, (decision, verdict) in enumerate(verdicts, 1):
+            out.write(json.dumps({"decision_id": decision.get("id", decision.get("decision_id")), **verdict}, ensure_ascii=False) + "\n")
+            if args.progress and n % args.progress == 0:
+                print(json.dumps(stats.summary()), file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if log_writer is not None:
+            log_writer.close()
+        if sig_pool is not None:
+            sig_pool.shutdown()
+    print(json.dumps(stats.summary()), file=sys.stderr)
+
+def cmd_dashboard_summary(args):
+    weights = load_weights_json(args.weights) if args.weights else None
+    out_path = args.output or summary_path(args.input)
+    summary = build_summary(args.input, out_path, weights=weights, points=args.points,
+                            page_size=args.page_size, chunksize=args.chunksize)
+    rep7 = summary["rep7"]
+    print(f"[OK] Súhrn uložený: {out_path} ({summary['rows']} riadkov, {len(summary['series']['aav'])} bodov grafu, "
+          f"{summary['table']['pages']} strán tabuľky)")
+    if rep7:
+        print(f"REP7: ΔAAV = {rep7['delta']:.4f}" + (" (ALERT)" if rep7["alert"] else ""))
+
 # -------------------------
 #  CLI parser
 # -------------------------
@@ -287,11 +698,13 @@ def build_parser():
 
     sp = sub.add_parser("compute-aav", help="Vypočíta AAV pre CSV súbor rozhodnutí.")
     sp.add_argument("--weights", required=True, help="cesta ku config/weights.json")
-    sp.add_argument("--scores", required=True, help="CSV s rozhodnutiami")
+    sp.add_argument("--scores", required=True, help="CSV s rozhodnutiami (alebo .parquet / .arrow)")
     sp.add_argument("--columns", required=False, help="voliteľný zoznam stĺpcov oddelených čiarkou v CSV (poradie musí sedieť)")
-    sp.add_argument("--output", required=False, help="výstupný CSV súbor")
+    sp.add_argument("--output", required=False, help="výstupný súbor; formát podľa prípony (.csv, .parquet, .arrow)")
     sp.add_argument("--audit", required=False, help="audit log path (default: audit/log.jsonl)")
     sp.add_argument("--actor", required=False, help="actor id pre audit (default: cli_user)")
+    sp.add_argument("--chunksize", type=int, default=None, help="streamovaný mód: počet riadkov na blok (pre CSV väčšie ako RAM)")
+    sp.add_argument("--workers", type=int, default=None, help="paralelný mód: počet procesov (shardy zarovnané na riadky)")
     sp.set_defaults(func=cmd_compute_aav)
 
     sp = sub.add_parser("bayes-update", help="Bayes aktualizácia pre Beta (vracia posterior mean).")
@@ -318,12 +731,36 @@ def build_parser():
     sp.add_argument("--output", required=False, help="uložiť výsledok JSON")
     sp.set_defaults(func=cmd_gd_update)
 
-    sp = sub.add_parser("merkle-root", help="Vygeneruje Merkle root z CSV (demo).")
-    sp.add_argument("--input", required=True, help="vstupný CSV súbor")
+    sp = sub.add_parser("merkle-root", help="Vygeneruje Merkle root z CSV (demo) alebo z adresára logov.")
+    sp.add_argument("--input", required=True, help="vstupný CSV / Parquet / Arrow súbor alebo adresár logov")
     sp.add_argument("--output", required=False, help="uložiť merkle root JSON")
     sp.add_argument("--max-rows", type=int, default=None, help="max počet riadkov (demo)")
+    sp.add_argument("--compact", action="store_true", help="binárny Merkle mód (32-bajtové digesty); default hex mód je kompatibilný so staršími rootmi")
+    sp.add_argument("--cache", required=False, help="adresár: SQLite cache hashov listov (mimo adresára logov)")
+    sp.add_argument("--verify-cache", action="store_true", help="adresár: prehashuje všetko a porovná s cache (detekcia manipulácie)")
+    sp.add_argument("--workers", type=int, default=None, help="adresár: počet vlákien pre hashovanie")
     sp.set_defaults(func=cmd_merkle_root)
 
+    sp = sub.add_parser("merkle-append", help="Pridá listy do perzistentného Merkle stromu (O(log n)).")
+    sp.add_argument("--store", required=True, help="adresár Merkle store")
+    sp.add_argument("--leaf", nargs="+", required=False, help="hex sha256 list(y)")
+    sp.add_argument("--file", nargs="+", required=False, help="súbor(y), list = sha256 obsahu (napr. decision log)")
+    sp.add_argument("--compact", action="store_true", help="binárny Merkle mód (pri vytvorení store; inak podľa store)")
+    sp.set_defaults(func=cmd_merkle_append)
+
+    sp = sub.add_parser("merkle-proof", help="Vygeneruje inclusion proof pre list v Merkle store.")
+    sp.add_argument("--store", required=True, help="adresár Merkle store")
+    sp.add_argument("--index", type=int, required=True, help="index listu")
+    sp.add_argument("--size", type=int, default=None, help="veľkosť stromu (anchorovaný root); default = aktuálna")
+    sp.add_argument("--output", required=False, help="uložiť proof JSON")
+    sp.set_defaults(func=cmd_merkle_proof)
+
+    sp = sub.add_parser("merkle-verify", help="Overí inclusion proof voči rootu.")
+    sp.add_argument("--proof", required=True, help="proof JSON (z merkle-proof)")
+    sp.add_argument("--root", required=True, help="anchorovaný root (povinný; root uložený v proof sa nepoužíva)")
+    sp.add_argument("--leaf", required=False, help="očakávaný list (hex); default = list v proof")
+    sp.set_defaults(func=cmd_merkle_verify)
+
     sp = sub.add_parser("audit-append", help="Pridá záznam do audit/log.jsonl")
     sp.add_argument("--audit", required=False, help="cesta k audit logu (default: audit/log.jsonl)")
     sp.add_argument("--actor", required=False, help="actor id")
@@ -334,6 +771,35 @@ def build_parser():
     sp.add_argument("--merkle", required=False, help="merkle leaf hash (voliteľné)")
     sp.set_defaults(func=cmd_audit_append)
 
+    sp = sub.add_parser("audit-verify", help="Overí hash-reťaz a checkpointy audit logu.")
+    sp.add_argument("--audit", required=False, help="cesta k audit logu (default: audit/log.jsonl)")
+    sp.add_argument("--state", required=False, help="stav posledného overeného checkpointu (default: <audit>.verified)")
+    sp.add_argument("--full", action="store_true", help="overiť celý log od začiatku")
+    sp.set_defaults(func=cmd_audit_verify)
+
+    sp = sub.add_parser("guard-batch", help="Execution guard nad prúdom rozhodnutí; verdikty ako JSONL.")
+    sp.add_argument("--input", required=True, help="JSONL s rozhodnutiami, '-' = stdin, alebo adresár segmentovaného logu")
+    sp.add_argument("--output", required=False, help="výstupný JSONL s verdiktmi (default: stdout)")
+    sp.add_argument("--weights", required=False, help="weights.json (kľúče INT..CRE) alebo JSON pole váh")
+    sp.add_argument("--model", required=False, help="joblib model")
+    sp.add_argument("--calibrator", required=False, help="joblib kalibrátor")
+    sp.add_argument("--chunk-size", type=int, default=1024, help="počet rozhodnutí na vektorizovaný blok")
+    sp.add_argument("--keyring", required=False, help="dôveryhodný JSON {actor_id: ed25519 pubkey hex} (default: $AXIOM_KEYRING alebo config/keyring.json; bez keyringu príkaz zlyhá)")
+    sp.add_argument("--workers", type=int, default=None, help="počet procesov pre overovanie podpisov")
+    sp.add_argument("--logdir", default=GUARD_LOGDIR, help=f"segmentovaný log vyhodnotení (default: {GUARD_LOGDIR})")
+    sp.add_argument("--no-log", action="store_true", help="nezapisovať log vyhodnotení")
+    sp.add_argument("--progress", type=int, default=0, help="každých N rozhodnutí vypísať počítadlá na stderr")
+    sp.set_defaults(func=cmd_guard_batch)
+
+    sp = sub.add_parser("dashboard-summary", help="Predpočíta súhrn pre live dashboard (sidecar JSON + strany tabuľky).")
+    sp.add_argument("--input", required=True, help="CSV / Parquet / Arrow s rozhodnutiami (napr. data/rozhodnutia_with_aav.csv)")
+    sp.add_argument("--output", required=False, help="výstupný JSON (default: <input>.summary.json vedľa vstupu)")
+    sp.add_argument("--weights", required=False, help="weights.json (kľúče INT..CRE); default 1.0 ako v dashboarde")
+    sp.add_argument("--points", type=int, default=1000, help="počet bodov AAV grafu (LTTB)")
+    sp.add_argument("--page-size", type=int, default=500, help="počet riadkov na stranu tabuľky")
+    sp.add_argument("--chunksize", type=int, default=100_000, help="počet riadkov na blok pri čítaní")
+    sp.set_defaults(func=cmd_dashboard_summary)
+
     return p
 
 def main():
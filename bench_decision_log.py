@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_decision_log.py
+
+Benchmark zápisu rozhodnutí (decisions/second):
+- file-per-decision: pôvodný layout (jeden JSON súbor na rozhodnutie)
+- segmented: decision_log.SegmentedLogWriter s rôznou group-commit politikou
+
+Použitie:
+    python bench_decision_log.py --decisions 20000 --dir /tmp/bench_logs
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from decision_log import SegmentedLogWriter, canonical_json
+
+def log_file_per_decision(logdir, record):
+    # rovnaká logika ako ai_pipeline.log_decision bez writer
+    os.makedirs(logdir, exist_ok=True)
+    ts = datetime.utcnow().isoformat() + "Z"
+    record["_logged_at"] = ts
+    j = canonical_json(record)
+    h = hashlib.sha256(j.encode("utf-8")).hexdigest()
+    fname = os.path.join(logdir, f"{ts.replace(':','_')}_{h[:8]}.json")
+    with open(fname, "w", encoding="utf-8") as f:
+        f.write(j)
+    return fname, h
+
+def make_record(i):
+    return {
+        "decision_id": f"bench-{i}",
+        "aav": 0.8,
+        "ai_raw": 0.6,
+        "ai_calibrated": 0.62,
+        "final_score": 0.746,
+        "action": "ACCEPT",
+        "reason": "Templated justification for benchmark decision.",
+        "scores": [0.82, 0.78, 0.9, 0.7, 0.85, 0.8, 0.88, 0.9],
+        "meta": {"actor": "bench", "i": i},
+    }
+
+def run(name, n, fn):
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(make_record(i))
+    dt = time.perf_counter() - t0
+    print(f"{name:>28}: {dt:8.3f} s  {n / dt:12,.0f} decisions/s")
+
+def main():
+    p = argparse.ArgumentParser(description="Decision log benchmark: file-per-decision vs segmented")
+    p.add_argument("--decisions", type=int, default=20000)
+    p.add_argument("--dir", default=None, help="pracovný adresár (default: dočasný)")
+    args = p.parse_args()
+
+    base = args.dir or tempfile.mkdtemp(prefix="bench_logs_")
+    os.makedirs(base, exist_ok=True)
+    try:
+        d = os.path.join(base, "files")
+        run("file-per-decision", args.decisions, lambda r: log_file_per_decision(d, r))
+        for label, kw in (
+            ("segmented (no fsync)", {}),
+            ("segmented (fsync/1000)", {"fsync_every": 1000}),
+            ("segmented (fsync/10ms)", {"fsync_interval": 0.01}),
+        ):
+            d = os.path.join(base, label.split()[1].strip("()").replace("/", "_"))
+            with SegmentedLogWriter(d, **kw) as w:
+                run(label, args.decisions, w.append)
+    finally:
+        if not args.dir:
+            shutil.rmtree(base, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_import.py
+
+Meria štart: wall time a max RSS pre `import execution_guard` v čerstvom procese
+(voliteľne aj s ai_pipeline.warm_up(), t.j. načítaním embedding modelu).
+
+Použitie:
+    python bench_import.py --repeat 5
+    python bench_import.py --repeat 3 --warm-up
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import execution_guard
+t1 = time.perf_counter()
+warm = None
+if {warm_up}:
+    import ai_pipeline
+    warm = ai_pipeline.warm_up()
+t2 = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(json.dumps({{"import_s": t1 - t0, "warm_up_s": t2 - t1, "model": warm, "max_rss_kb": rss}}))
+"""
+
+def main():
+    p = argparse.ArgumentParser(description="Startup benchmark pre import execution_guard")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--warm-up", action="store_true", help="po importe zavolať ai_pipeline.warm_up()")
+    args = p.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = CHILD.format(warm_up=args.warm_up)
+    runs = []
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, check=True, capture_output=True, text=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    imp = [r["import_s"] for r in runs]
+    rss = [r["max_rss_kb"] for r in runs]
+    print(f"import execution_guard: median {statistics.median(imp) * 1000:.1f} ms (min {min(imp) * 1000:.1f} ms)")
+    print(f"max RSS: median {statistics.median(rss) / 1024:.1f} MB")
+    if args.warm_up:
+        warm = [r["warm_up_s"] for r in runs]
+        print(f"warm_up(): median {statistics.median(warm) * 1000:.1f} ms, model loaded: {runs[-1]['model']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_merkle.py
+
+Benchmark Merkle módov (nodes/second):
+- hex: hex-kompatibilný mód (sha256 nad zreťazenými 64-znakovými hex stringami)
+- compact: MerkleAccumulator(compact=True), 32-bajtové digesty
+- compact-buffer: merkle_root_from_digest_buffer, in-place nad jedným bytearray
+
+Použitie:
+    python bench_merkle.py --leaves 262144 --repeat 3
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+from anchor import MerkleAccumulator, merkle_root_from_digest_buffer
+
+def count_internal_nodes(n):
+    """Počet hashovaných uzlov pri pravidle duplikácie posledného uzla."""
+    total = 0
+    while n > 1:
+        n = (n + 1) // 2
+        total += n
+    return total
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+def main():
+    p = argparse.ArgumentParser(description="Merkle benchmark: hex vs compact mód")
+    p.add_argument("--leaves", type=int, default=1 << 18)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    digests = [hashlib.sha256(os.urandom(16)).digest() for _ in range(args.leaves)]
+    hexes = [d.hex() for d in digests]
+    buf = b"".join(digests)
+    nodes = count_internal_nodes(args.leaves)
+
+    modes = {
+        "hex": lambda: MerkleAccumulator().extend(hexes).root(),
+        "compact": lambda: MerkleAccumulator(compact=True).extend(digests).root(),
+        "compact-buffer": lambda: merkle_root_from_digest_buffer(buf),
+    }
+    print(f"leaves={args.leaves} internal_nodes={nodes}")
+    for name, fn in modes.items():
+        dt = best_of(fn, args.repeat)
+        print(f"{name:>15}: {dt:8.4f} s  {nodes / dt:14,.0f} nodes/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_signatures.py
+
+Benchmark overovania ed25519 podpisov rozhodnutí (verifications/second):
+- single: verify_decision po jednom, bez cache
+- batch: verify_decisions nad celým zoznamom, bez cache
+- batch-cached: druhý prechod s teplou cache (retry scenár)
+- pool: verify_decisions s process poolom (--workers)
+
+Použitie:
+    python bench_signatures.py --decisions 20000 --signers 3 --workers 8
+"""
+
+import argparse
+import time
+
+from signatures import BACKEND, SignatureCache, generate_keypair, sign_decision, verify_decision, verify_decisions
+
+def make_decisions(n, signers):
+    """Podpísané rozhodnutia a keyring {actor_id: pubkey} ich podpisovateľov."""
+    keys = [generate_keypair() for _ in range(signers)]
+    keyring = {f"actor-{j}": public_key for j, (_, public_key) in enumerate(keys)}
+    decisions = []
+    for i in range(n):
+        d = {"id": f"bench-{i}", "scores": [0.8] * 8, "reason": f"bench decision {i}"}
+        for j, (private_key, _) in enumerate(keys):
+            sign_decision(d, private_key, f"actor-{j}")
+        decisions.append(d)
+    return decisions, keyring
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark overovania ed25519 podpisov")
+    p.add_argument("--decisions", type=int, default=20000)
+    p.add_argument("--signers", type=int, default=2, help="podpisov na rozhodnutie")
+    p.add_argument("--workers", type=int, default=4)
+    args = p.parse_args()
+
+    decisions, keyring = make_decisions(args.decisions, args.signers)
+    sigs = args.decisions * args.signers
+    print(f"backend={BACKEND} decisions={args.decisions} signatures={sigs}")
+
+    cache = SignatureCache()
+    modes = [
+        ("single", lambda: [verify_decision(d, keyring=keyring, cache=None) for d in decisions]),
+        ("batch", lambda: verify_decisions(decisions, keyring=keyring, cache=None)),
+        ("batch-cold", lambda: verify_decisions(decisions, keyring=keyring, cache=cache)),
+        ("batch-cached", lambda: verify_decisions(decisions, keyring=keyring, cache=cache)),
+        ("pool", lambda: verify_decisions(decisions, keyring=keyring, cache=None, workers=args.workers)),
+    ]
+    for name, fn in modes:
+        result, dt = timed(fn)
+        assert all(result)
+        print(f"{name:>13}: {dt:8.4f} s  {sigs / dt:12,.0f} verifications/s")
+
+if __name__ == "__main__":
+    main()
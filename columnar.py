@@ -0,0 +1,153 @@
+# columnar.py
+"""
+Optional columnar storage (Parquet / Arrow IPC) for decision tables.
+
+The format follows the file extension: .parquet / .pq -> Parquet,
+.arrow / .feather / .ipc -> Arrow IPC file; anything else is not columnar
+(callers keep their CSV path). pyarrow is an optional import and a missing
+pyarrow raises RuntimeError on first use.
+
+Reads are memory-mapped and project columns, so a reader that needs only
+AAV and Status never decodes (for Arrow IPC: never touches) the other columns.
+
+cell_text() renders a value the way pandas writes it to CSV (floats as
+shortest round-trip repr, missing values as ""), so a row read from Parquet /
+Arrow serializes to the same text as the same row read from the CSV written
+from the same DataFrame; Merkle leaves do not depend on the storage format.
+"""
+import math
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+PARQUET_EXTS = (".parquet", ".pq")
+ARROW_EXTS = (".arrow", ".feather", ".ipc")
+
+def _require_arrow():
+    if pa is None:
+        raise RuntimeError("Parquet / Arrow I/O needs pyarrow (pip install pyarrow)")
+
+def columnar_format(path):
+    """'parquet', 'arrow' or None (not a columnar file) by extension."""
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in PARQUET_EXTS:
+        return "parquet"
+    if ext in ARROW_EXTS:
+        return "arrow"
+    return None
+
+def cell_text(v):
+    """Text of one cell as pandas.to_csv writes it (None / NaN -> "")."""
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        return "" if math.isnan(v) else repr(v)
+    return str(v)
+
+def column_names(path):
+    _require_arrow()
+    if columnar_format(path) == "parquet":
+        return list(pq.read_schema(path, memory_map=True).names)
+    with pa.memory_map(path, "r") as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+def _check_columns(path, columns):
+    if columns is not None:
+        missing = [c for c in columns if c not in column_names(path)]
+        if missing:
+            raise ValueError(f"Missing expected columns in {path}: {missing}")
+
+def iter_batches(path, columns=None, batch_size=65536):
+    """Record batches of a Parquet / Arrow file, only `columns` (default: all)."""
+    _require_arrow()
+    _check_columns(path, columns)
+    if columnar_format(path) == "parquet":
+        pf = pq.ParquetFile(path, memory_map=True)
+        yield from pf.iter_batches(batch_size=batch_size, columns=columns)
+        return
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, batch_size):
+                yield batch.slice(start, batch_size)
+
+def read_table(path, columns=None):
+    _require_arrow()
+    _check_columns(path, columns)
+    if columnar_format(path) == "parquet":
+        return pq.read_table(path, columns=columns, memory_map=True)
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+def read_frame(path, columns=None):
+    """Whole file (or only `columns`) as a pandas DataFrame."""
+    return read_table(path, columns=columns).to_pandas()
+
+def iter_frames(path, chunksize, columns=None):
+    """pandas DataFrames of at most `chunksize` rows."""
+    for batch in iter_batches(path, columns=columns, batch_size=chunksize):
+        yield batch.to_pandas()
+
+def iter_rows(path, columns=None, batch_size=65536):
+    """Rows as {column: cell_text} dicts - the same values csv.DictReader gives for the CSV form."""
+    for batch in iter_batches(path, columns=columns, batch_size=batch_size):
+        names = batch.schema.names
+        cols = [[cell_text(v) for v in batch.column(i).to_pylist()] for i in range(len(names))]
+        for values in zip(*cols):
+            yield dict(zip(names, values))
+
+class ColumnarWriter:
+    """
+    Appends DataFrame chunks to one Parquet (a row group per chunk) or Arrow IPC
+    file. The schema comes from the first chunk; later chunks are cast to it.
+    """
+
+    def __init__(self, path):
+        _require_arrow()
+        self.path = path
+        self.format = columnar_format(path)
+        if self.format is None:
+            raise ValueError(f"Not a Parquet / Arrow path: {path}")
+        self._schema = None
+        self._writer = None
+        self._sink = None
+        self.rows = 0
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._sink = pa.OSFile(self.path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_frame(df, path):
+    with ColumnarWriter(path) as w:
+        w.write(df)
+    return len(df)
@@ -12,6 +12,50 @@ def compute_aav(weights, scores, biases=None, reciprocities=None):
     denom = np.sum(weights)
     return float(numerator / denom) if denom != 0 else 0.0
 
+def _float_array(x, name):
+    """Skonvertuje sekvenciu / maticu na float ndarray; ak neúspech -> ValueError."""
+    try:
+        return np.asarray(x, dtype=float)
+    except Exception as e:
+        raise ValueError(f"Cannot convert {name} to float") from e
+
+def compute_aav_matrix(weights, scores, biases=None, reciprocities=None):
+    """
+    Vektorizovaný AAV pre celú maticu skóre naraz (riadky × axiómy).
+    weights, biases, reciprocities: vektor dĺžky počtu axióm (rovnaký pre každý
+    riadok) alebo matica rovnakého tvaru ako scores (per-riadok); biases a
+    reciprocities default 1.
+    Vracia numpy vektor AAV, jeden prvok na riadok.
+    """
+    s = _float_array(scores, "scores")
+    if s.ndim != 2:
+        raise ValueError("scores must be a 2D matrix (rows x axioms)")
+    allowed = (s.shape[1:], s.shape)
+
+    w = _float_array(weights, "weights")
+    if w.shape not in allowed:
+        raise ValueError("weights and scores must have same length")
+
+    num = w * s
+    for name, factor in (("biases", biases), ("reciprocities", reciprocities)):
+        if factor is None:
+            continue
+        f = _float_array(factor, name)
+        if f.shape not in allowed:
+            raise ValueError(f"{name} must match scores length")
+        num *= f
+
+    denominator = w.sum(axis=-1)
+    if np.any(denominator == 0):
+        raise ZeroDivisionError("Sum of weights is zero")
+    # súčet stĺpcov zľava doprava: výsledok riadku nezávisí od počtu riadkov
+    # v matici (BLAS matmul ani sum(axis=1) to nezaručujú), takže blokové,
+    # paralelné aj celé spracovanie dajú bitovo rovnaké AAV
+    numerator = num[:, 0].copy()
+    for j in range(1, num.shape[1]):
+        numerator += num[:, j]
+    return numerator / denominator
+
 if __name__ == "__main__":
     w = [1.0,0.95,0.90,0.85,0.95,0.80,0.85,0.95]
     s = [0.85,0.78,0.92,0.70,0.95,0.82,0.88,0.91]
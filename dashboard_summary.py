@@ -0,0 +1,319 @@
+# dashboard_summary.py
+"""
+Precomputed summary sidecar for the live dashboard (AxiomI_live_dashboard_html.py).
+
+Instead of fetching the whole rozhodnutia_with_aav.csv and recomputing it in
+the browser, the dashboard loads what build_summary() writes in one chunked
+pass over the table (CSV, or Parquet / Arrow via columnar):
+  <base>.summary.json        - counts, AAV statistics, per-axiom means (radar),
+                               LTTB-downsampled AAV series, REP7 check and the
+                               first table page
+  <base>.summary.p0002.json  - further table pages, fetched on demand
+
+Per-row AAV follows computeAavsFromRows in the dashboard: weighted mean of the
+available axiom scores (a missing score falls back to the AAV column), 0 when
+there are none. The series keeps the axiom scores of its points and the REP7
+entry keeps per-axiom means of the first / last quarter, so the weight sliders
+can recompute them without the raw rows (exact for rows with all scores).
+
+Memory does not grow with the table: the series is downsampled while the
+chunks stream in (_SeriesSampler), the aggregates are running sums and
+OnlineStats, and the REP7 quarters come from per-block sums (_BlockSums).
+"""
+import glob
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from columnar import cell_text, columnar_format, iter_frames
+from online_stats import OnlineStats
+
+AXIOMS = [
+    ("INT", "Zámer (INT)"), ("LEX", "Existencia (LEX)"), ("WIS", "Múdrosť (WIS)"), ("REL", "Vzájomnosť (REL)"),
+    ("VER", "Pravda (VER)"), ("LIB", "Sloboda (LIB)"), ("UNI", "Jednota (UNI)"), ("CRE", "Tvorba (CRE)"),
+]
+REP7_THRESHOLD = 0.15
+SERIES_POINTS = 1000
+PAGE_SIZE = 500
+CHUNKSIZE = 100_000
+BLOCK_ROWS = 1024
+
+def summary_path(path):
+    return os.path.splitext(path)[0] + ".summary.json"
+
+def page_path(summary_file, page):
+    return summary_file[:-len(".json")] + f".p{page:04d}.json"
+
+def match_axiom_columns(headers):
+    """{axiom id: column} using the dashboard's rule: first header containing the label or the id."""
+    found = {}
+    for axiom_id, label in AXIOMS:
+        aliases = (label.lower(), axiom_id.lower())
+        found[axiom_id] = next((h for h in headers if any(a in h.strip().lower() for a in aliases)), None)
+    return found
+
+def parse_numbers(col):
+    """Numbers like the dashboard's parseNumber (decimal comma allowed), NaN where not numeric."""
+    return pd.to_numeric(col.astype(str).str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=float)
+
+def weighted_aav(scores, weights):
+    """Row-wise weighted mean over non-missing scores (n x axioms, NaN = missing); 0 without scores."""
+    w = np.broadcast_to(np.asarray(weights, dtype=float), scores.shape)
+    present = ~np.isnan(scores)
+    num = np.where(present, scores * w, 0.0).sum(axis=1)
+    den = np.where(present, w, 0.0).sum(axis=1)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+def lttb_indices(y, threshold, x=None):
+    """
+    Largest-Triangle-Three-Buckets downsampling of y over row indices x
+    (default: its positions); buckets split the x range evenly, so a sparse
+    x keeps its spacing. Returns the kept positions.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    every = (x[-1] - x[0] - 1) / (threshold - 2)
+    bounds = np.searchsorted(x, x[0] + np.arange(threshold - 1) * every, side="right")
+    bounds[-1] = n - 1
+    out = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        if start >= end:
+            continue
+        avg_end = max(bounds[i + 2] if i + 2 < len(bounds) else n, end + 1)
+        avg_x, avg_y = x[end:avg_end].mean(), y[end:avg_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out.append(a)
+    out.append(n - 1)
+    return np.asarray(out)
+
+class _SeriesSampler:
+    """
+    Streaming LTTB: each chunk is reduced to `points` candidates, and the
+    candidate pool is reduced again (over the row index) whenever it passes
+    4 * points, so memory stays O(points + chunk) however long the table is.
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self.index = np.zeros(0, dtype=np.int64)
+        self.aav = np.zeros(0)
+        self.scores = np.zeros((0, len(AXIOMS)))
+        self.labels = np.zeros(0, dtype=object)
+
+    def _keep(self, keep):
+        self.index, self.aav = self.index[keep], self.aav[keep]
+        self.scores, self.labels = self.scores[keep], self.labels[keep]
+
+    def add(self, start, aav, scores, labels):
+        if len(aav) == 0:
+            return
+        keep = lttb_indices(aav, self.points)
+        self.index = np.concatenate([self.index, start + keep])
+        self.aav = np.concatenate([self.aav, aav[keep]])
+        self.scores = np.vstack([self.scores, scores[keep]])
+        self.labels = np.concatenate([self.labels, np.asarray(labels, dtype=object)[keep]])
+        if len(self.index) > 4 * self.points:
+            self._keep(lttb_indices(self.aav, 2 * self.points, x=self.index))
+
+    def finish(self):
+        self._keep(lttb_indices(self.aav, self.points, x=self.index))
+        return self
+
+def _row_sums(aav, scores):
+    """[sum AAV, per-axiom score sums, per-axiom score counts] over the given rows."""
+    present = ~np.isnan(scores)
+    return np.concatenate([[aav.sum()], np.where(present, scores, 0.0).sum(axis=0), present.sum(axis=0)])
+
+class _BlockSums:
+    """_row_sums of every block of BLOCK_ROWS rows: O(rows / BLOCK_ROWS) memory for the REP7 quarters."""
+
+    def __init__(self):
+        self.blocks = []
+
+    def add(self, start, aav, scores):
+        if len(aav) == 0:
+            return
+        present = ~np.isnan(scores)
+        rows = np.column_stack([aav, np.where(present, scores, 0.0), present])
+        block = (start + np.arange(len(aav))) // BLOCK_ROWS
+        cuts = np.flatnonzero(np.diff(block)) + 1
+        for b, sums in zip(block[np.r_[0, cuts]], np.add.reduceat(rows, np.r_[0, cuts], axis=0)):
+            if b < len(self.blocks):
+                self.blocks[b] = self.blocks[b] + sums
+            else:
+                self.blocks.append(sums)
+
+    def total(self, first_block, stop_block):
+        width = 1 + 2 * len(AXIOMS)
+        return np.sum(self.blocks[first_block:stop_block], axis=0) if stop_block > first_block else np.zeros(width)
+
+def _rep7_from_sums(first, last, k, threshold=REP7_THRESHOLD):
+    """runRep7Check from _row_sums of the first / last k rows."""
+    m = len(AXIOMS)
+    avg_first, avg_last = first[0] / k, last[0] / k
+    delta = avg_last - avg_first
+    means = lambda v: [_r(t / c) if c else None for t, c in zip(v[1:1 + m], v[1 + m:])]
+    return {
+        "threshold": threshold, "slice": k,
+        "avg_first": _r(avg_first), "avg_last": _r(avg_last), "delta": _r(delta),
+        "alert": bool(abs(delta) >= threshold),
+        "first_means": means(first), "last_means": means(last),
+    }
+
+def _r(v, nd=6):
+    return None if v is None or (isinstance(v, float) and math.isnan(v)) else round(float(v), nd)
+
+def _text_frame(df):
+    return pd.DataFrame({c: [cell_text(v) for v in df[c].tolist()] for c in df.columns}, columns=df.columns)
+
+def _iter_text_chunks(path, chunksize):
+    """Chunks with every cell as text, as PapaParse / csv.DictReader would give it."""
+    if columnar_format(path):
+        for df in iter_frames(path, chunksize):
+            yield _text_frame(df)
+    else:
+        yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize)
+
+def _text_rows(path, start, stop, chunksize=CHUNKSIZE):
+    """Rows [start, stop) as a text chunk (re-read of at most one block for the REP7 quarters)."""
+    if not columnar_format(path):
+        return pd.read_csv(path, dtype=str, keep_default_na=False, skiprows=lambda i: 0 < i <= start, nrows=stop - start)
+    parts, offset = [], 0
+    for df in iter_frames(path, chunksize):
+        lo, hi = max(start - offset, 0), min(stop - offset, len(df))
+        if lo < hi:
+            parts.append(_text_frame(df.iloc[lo:hi]))
+        offset += len(df)
+        if offset >= stop:
+            break
+    return pd.concat(parts, ignore_index=True)
+
+class _Columns:
+    """Column roles of one table, resolved from its header like the dashboard does."""
+
+    def __init__(self, headers):
+        self.axioms = match_axiom_columns(headers)
+        self.aav = next((h for h in headers if "aav" in h.lower()), None)
+        self.status = next((h for h in ("Status", "status") if h in headers), None)
+        self.label = next((h for h in ("Dátum", "Date") if h in headers), None)
+        self.fields = headers + ([] if self.aav else ["AAV"])
+
+    def values(self, chunk, weights):
+        """(raw axiom scores, scores with the AAV fallback, per-row AAV) of a text chunk."""
+        raw = np.column_stack([parse_numbers(chunk[c]) if c else np.full(len(chunk), np.nan)
+                               for c in self.axioms.values()])
+        scores = raw
+        if self.aav is not None:
+            scores = np.where(np.isnan(raw), parse_numbers(chunk[self.aav])[:, None], raw)
+        return raw, scores, weighted_aav(scores, weights)
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def build_summary(path, out_path=None, weights=None, points=SERIES_POINTS, page_size=PAGE_SIZE, chunksize=CHUNKSIZE):
+    """
+    Read the decisions table once and write the sidecar (+ table pages).
+    weights: {axiom id: weight}, default 1.0 each (the dashboard default).
+    Memory: one chunk, one table page, the series candidates and one sum
+    vector per BLOCK_ROWS rows; the REP7 quarters re-read at most two blocks.
+    Returns the summary dict.
+    """
+    out_path = out_path or summary_path(path)
+    w = [max(0.0, float((weights or {}).get(axiom_id, 1.0))) for axiom_id, _ in AXIOMS]
+    stats = OnlineStats()
+    sampler = _SeriesSampler(points)
+    blocks = _BlockSums()
+    raw_sums, raw_counts = np.zeros(len(AXIOMS)), np.zeros(len(AXIOMS))
+    cols = None
+    page, page_rows, first_page, rows = 1, [], None, 0
+
+    def flush_page(final=False):
+        nonlocal page, page_rows, first_page
+        if not page_rows and not (final and first_page is None):
+            return
+        if page == 1:
+            first_page = page_rows
+        else:
+            _write_json(page_path(out_path, page), {"page": page, "offset": (page - 1) * page_size, "rows": page_rows})
+        page, page_rows = page + 1, []
+
+    for chunk in _iter_text_chunks(path, chunksize):
+        if cols is None:
+            cols = _Columns(list(chunk.columns))
+        raw, scores, aav = cols.values(chunk, w)
+        raw_sums += np.nansum(raw, axis=0)
+        raw_counts += (~np.isnan(raw)).sum(axis=0)
+        stats.add_many(aav.tolist(), chunk[cols.status].tolist() if cols.status else None)
+        labels = chunk[cols.label].to_numpy(dtype=object) if cols.label else rows + 1 + np.arange(len(chunk))
+        sampler.add(rows, aav, scores, labels)
+        blocks.add(rows, aav, scores)
+        # table: the dashboard shows the computed AAV in the AAV column
+        table = chunk.assign(AAV=[f"{v:.6f}" for v in aav])[cols.fields]
+        for row in table.itertuples(index=False, name=None):
+            page_rows.append(list(row))
+            if len(page_rows) == page_size:
+                flush_page()
+        rows += len(chunk)
+    flush_page(final=True)
+    sampler.finish()
+
+    def range_sums(start, stop):
+        # whole blocks from the block sums, the partial block at either end re-read
+        first_block, stop_block = -(-start // BLOCK_ROWS), stop // BLOCK_ROWS
+        if first_block >= stop_block:
+            _, scores, aav = cols.values(_text_rows(path, start, stop, chunksize), w)
+            return _row_sums(aav, scores)
+        total = blocks.total(first_block, stop_block)
+        for lo, hi in ((start, first_block * BLOCK_ROWS), (stop_block * BLOCK_ROWS, stop)):
+            if lo < hi:
+                _, scores, aav = cols.values(_text_rows(path, lo, hi, chunksize), w)
+                total = total + _row_sums(aav, scores)
+        return total
+
+    rep7 = None
+    if rows >= 4:
+        k = max(1, int(rows * 0.25))
+        rep7 = _rep7_from_sums(range_sums(0, k), range_sums(rows - k, rows), k)
+    totals = blocks.total(0, len(blocks.blocks))
+    m = len(AXIOMS)
+    s = stats.summary()
+    pages = max(1, -(-rows // page_size))
+    summary = {
+        "version": 1,
+        "generated": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "source": os.path.basename(path),
+        "rows": rows,
+        "axioms": [axiom_id for axiom_id, _ in AXIOMS],
+        "weights": dict(zip((axiom_id for axiom_id, _ in AXIOMS), w)),
+        "stats": {k: (_r(v) if isinstance(v, float) else v) for k, v in s.items()},
+        "axiom_means": [_r(t / c) if c else 0.0 for t, c in zip(raw_sums, raw_counts)],
+        "aav_means": [_r(t / c) if c else None for t, c in zip(totals[1:1 + m], totals[1 + m:])],
+        "series": {
+            "method": "lttb",
+            "index": sampler.index.tolist(),
+            "labels": [str(v) for v in sampler.labels],
+            "aav": [_r(v) for v in sampler.aav],
+            "scores": [[_r(v) for v in row] for row in sampler.scores],
+        },
+        "rep7": rep7,
+        "table": {"fields": cols.fields if cols else [], "page_size": page_size, "pages": pages, "first_page": first_page or []},
+    }
+    _write_json(out_path, summary)
+    # pages of an older, longer table would otherwise be served with the new summary
+    for stale in glob.glob(glob.escape(out_path[:-len(".json")]) + ".p*.json"):
+        suffix = stale[len(out_path) - len(".json") + 2:-len(".json")]
+        if suffix.isdigit() and int(suffix) > pages:
+            os.remove(stale)
+    return summary
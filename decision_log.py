@@ -0,0 +1,255 @@
+# decision_log.py
+"""
+Segmented append-only decision log.
+
+Instead of one JSON file per decision, canonical JSON records are appended as
+lines to size-rotated segment files:
+  seg_000000.jsonl  - one canonical JSON record per line
+  seg_000000.idx    - little-endian uint64 byte offset of every record
+Every append call writes its records to the OS under an exclusive flock on
+the active segment, so several processes can append to one logdir. Durability
+uses group commit: records are fsynced every `fsync_every` records and/or
+every `fsync_interval` seconds (0 = every append call). With both off nothing
+is fsynced: records survive a crash of the process, not of the machine.
+
+A record location is "<segment path>#<byte offset>"; the sha256 is computed
+over the same canonical JSON as ai_pipeline.log_decision, so leaves for Merkle
+anchoring do not change with the storage layout.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: only in-process locking
+    fcntl = None
+
+OFFSET = struct.Struct("<Q")
+SEGMENT_BYTES = 64 * 1024 * 1024
+# guard logs live apart from the file-per-decision logs anchored by merkle-root --dir ./logs
+GUARD_LOGDIR = os.path.join("logs", "guard")
+
+def canonical_json(obj):
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+def _segment_paths(logdir, seq):
+    base = os.path.join(logdir, f"seg_{seq:06d}")
+    return base + ".jsonl", base + ".idx"
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def list_segments(logdir):
+    """Sequence numbers of existing segments, in order."""
+    if not os.path.isdir(logdir):
+        return []
+    seqs = []
+    for name in os.listdir(logdir):
+        if name.startswith("seg_") and name.endswith(".jsonl"):
+            seqs.append(int(name[4:-6]))
+    return sorted(seqs)
+
+class SegmentedLogWriter:
+    """
+    Thread- and process-safe appender; use as a context manager or call close().
+    Every append call holds an exclusive flock on the active segment, takes
+    record offsets from fstat and writes data and index before unlocking, so
+    several writers (e.g. guard_service and a guard-batch run) can share one
+    logdir; a writer follows rotations made by the others.
+    """
+
+    def __init__(self, logdir, segment_bytes=SEGMENT_BYTES, fsync_every=0, fsync_interval=None):
+        self.logdir = logdir
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        os.makedirs(logdir, exist_ok=True)
+        seqs = list_segments(logdir)
+        self._seq = seqs[-1] if seqs else 0
+        self._open_segment()
+        self._lock_segment(recover=bool(seqs))
+        self._unlock_segment()
+
+    def _open_segment(self):
+        data_path, idx_path = _segment_paths(self.logdir, self._seq)
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT
+        self._data_path = data_path
+        self._data = os.open(data_path, flags, 0o644)
+        self._idx = os.open(idx_path, flags, 0o644)
+        self._size = None
+
+    def _close_segment(self):
+        os.close(self._data)
+        os.close(self._idx)
+
+    def _lock_segment(self, recover=False):
+        """
+        Exclusive flock on the newest segment and its current size in _size.
+        A torn tail (a writer died mid-record) is only dropped here, under the
+        exclusive lock, where no live writer can be in the middle of a record.
+        """
+        while True:
+            if fcntl is not None:
+                fcntl.flock(self._data, fcntl.LOCK_EX)
+            if not os.path.exists(_segment_paths(self.logdir, self._seq + 1)[0]):
+                break
+            # another writer rotated: move on to its segment
+            self._unlock_segment()
+            self._close_segment()
+            self._seq += 1
+            self._open_segment()
+        size = os.fstat(self._data).st_size
+        if recover or (size != self._size and size and os.pread(self._data, 1, size - 1) != b"\n"):
+            self._recover(*_segment_paths(self.logdir, self._seq))
+            size = os.fstat(self._data).st_size
+        self._size = size
+
+    def _unlock_segment(self):
+        if fcntl is not None:
+            fcntl.flock(self._data, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _recover(data_path, idx_path):
+        """Drop a torn trailing record and rebuild the index of the last segment."""
+        offsets, good = [], 0
+        with open(data_path, "rb") as f:
+            pos = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offsets.append(pos)
+                pos += len(line)
+            good = pos
+        if os.path.getsize(data_path) != good:
+            os.truncate(data_path, good)
+        with open(idx_path, "wb") as f:
+            f.write(b"".join(OFFSET.pack(o) for o in offsets))
+
+    def _rotate(self):
+        """Start the next segment (caller holds the lock of the current one)."""
+        self._sync()
+        old_data, old_idx = self._data, self._idx
+        self._seq += 1
+        self._open_segment()
+        if fcntl is not None:
+            fcntl.flock(self._data, fcntl.LOCK_EX)
+            fcntl.flock(old_data, fcntl.LOCK_UN)
+        os.close(old_data)
+        os.close(old_idx)
+        self._size = 0
+
+    def _sync(self):
+        if self.fsync_every or self.fsync_interval is not None:
+            os.fsync(self._data)
+            os.fsync(self._idx)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def _encode(record):
+        record = dict(record, _logged_at=datetime.utcnow().isoformat() + "Z")
+        line = canonical_json(record).encode("utf-8")
+        return line, hashlib.sha256(line).hexdigest()
+
+    def _write(self, lines, offsets):
+        _write_all(self._data, b"".join(lines))
+        _write_all(self._idx, b"".join(OFFSET.pack(o) for o in offsets))
+        lines.clear()
+        offsets.clear()
+
+    def _write_lines(self, lines):
+        """Append encoded lines under the segment lock (caller holds self._lock); returns locations."""
+        locations, data, offsets = [], [], []
+        self._lock_segment()
+        try:
+            for line in lines:
+                if self._size and self._size + len(line) + 1 > self.segment_bytes:
+                    self._write(data, offsets)
+                    self._rotate()
+                locations.append(f"{self._data_path}#{self._size}")
+                offsets.append(self._size)
+                data.append(line + b"\n")
+                self._size += len(line) + 1
+            self._write(data, offsets)
+        finally:
+            self._unlock_segment()
+        self._unsynced += len(lines)
+        return locations
+
+    def _maybe_sync(self):
+        if (self.fsync_every and self._unsynced >= self.fsync_every) or (
+            self.fsync_interval is not None and time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync()
+
+    def append(self, record):
+        """Append a copy of record with `_logged_at` added; returns (location, sha256)."""
+        line, h = self._encode(record)
+        with self._lock:
+            location, = self._write_lines([line])
+            self._maybe_sync()
+        return location, h
+
+    def append_many(self, records):
+        """Append records under one lock / one commit check; returns [(location, sha256)]."""
+        encoded = [self._encode(r) for r in records]
+        with self._lock:
+            locations = self._write_lines([line for line, _ in encoded])
+            self._maybe_sync()
+        return [(loc, h) for loc, (_, h) in zip(locations, encoded)]
+
+    def flush(self):
+        with self._lock:
+            if self._data is not None:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._data is None:
+                return
+            self._sync()
+            self._close_segment()
+            self._data = self._idx = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_records(logdir, with_location=False):
+    """Iterate records of all segments in append order."""
+    for seq in list_segments(logdir):
+        data_path, _ = _segment_paths(logdir, seq)
+        with open(data_path, "rb") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn tail of a segment being written
+                record = json.loads(line)
+                yield (f"{data_path}#{offset}", record) if with_location else record
+                offset += len(line)
+
+def read_record(location):
+    """Read one record by its location string."""
+    data_path, offset = location.rsplit("#", 1)
+    with open(data_path, "rb") as f:
+        f.seek(int(offset))
+        return json.loads(f.readline())
+
+def record_offsets(logdir, seq):
+    """Byte offsets of all records of one segment (from its index)."""
+    _, idx_path = _segment_paths(logdir, seq)
+    with open(idx_path, "rb") as f:
+        data = f.read()
+    return [o for (o,) in OFFSET.iter_unpack(data[:len(data) - len(data) % OFFSET.size])]
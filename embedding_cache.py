@@ -0,0 +1,244 @@
+# embedding_cache.py
+"""
+Content-addressed embedding cache.
+
+Key = sha256(model_id + "\\0" + normalized text). Two tiers:
+- in-process LRU bounded by bytes (float32 vectors)
+- optional on-disk store shared by worker processes: an mmap'd open-addressing
+  index (emb_<dim>.idx) and an append-only float32 matrix (emb_<dim>.f32);
+  writers serialize through flock, readers are lock-free.
+
+The cache embeds the *normalized* text and always returns float32 values (as
+float64 arrays), so a hit and a miss for the same text give identical vectors.
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: only in-process locking
+    fcntl = None
+
+_WS = re.compile(r"\s+")
+
+def normalize_text(text):
+    """NFC, collapsed whitespace, stripped (case is kept: it can carry meaning)."""
+    return _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def cache_key(text, model_id):
+    return hashlib.sha256(model_id.encode("utf-8") + b"\0" + text.encode("utf-8")).digest()
+
+class DiskEmbeddingStore:
+    """Fixed-capacity mmap hash index + append-only float32 vectors for one dimension."""
+
+    SLOT = struct.Struct("<I16s")  # row + 1 (0 = empty), key prefix
+    MAX_PROBE = 64
+
+    def __init__(self, path, dim, capacity=1 << 20):
+        os.makedirs(path, exist_ok=True)
+        base = os.path.join(path, f"emb_{dim}")
+        self.dim = dim
+        self._row_bytes = dim * 4
+        self._lock_path = base + ".lock"
+        self._vec_path = base + ".f32"
+        self._thread_lock = threading.Lock()
+        # guards self._vec_map: a remap closes the old map under concurrent readers
+        self._map_lock = threading.Lock()
+        idx_path = base + ".idx"
+        with self._locked():
+            if not os.path.exists(idx_path):
+                with open(idx_path, "wb") as f:
+                    f.truncate(capacity * self.SLOT.size)
+            open(self._vec_path, "ab").close()
+        self._idx_file = open(idx_path, "r+b")
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0)
+        self.capacity = len(self._idx) // self.SLOT.size
+        self._vec_map = None
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _probe(self, key):
+        start = int.from_bytes(key[:8], "little") % self.capacity
+        for i in range(self.MAX_PROBE):
+            yield ((start + i) % self.capacity) * self.SLOT.size
+
+    def _vector(self, row):
+        end = (row + 1) * self._row_bytes
+        with self._map_lock:
+            if self._vec_map is None or len(self._vec_map) < end:
+                if self._vec_map is not None:
+                    self._vec_map.close()
+                with open(self._vec_path, "rb") as f:
+                    self._vec_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return np.frombuffer(self._vec_map, dtype="<f4", count=self.dim, offset=row * self._row_bytes).copy()
+
+    def get(self, key):
+        prefix = key[:16]
+        for off in self._probe(key):
+            row1, k = self.SLOT.unpack_from(self._idx, off)
+            if row1 == 0:
+                return None
+            if k == prefix:
+                return self._vector(row1 - 1)
+        return None
+
+    def put(self, key, vec):
+        prefix = key[:16]
+        with self._locked():
+            for off in self._probe(key):
+                row1, k = self.SLOT.unpack_from(self._idx, off)
+                if row1 and k == prefix:
+                    return
+                if row1 == 0:
+                    with open(self._vec_path, "ab") as f:
+                        row = f.tell() // self._row_bytes
+                        f.write(np.asarray(vec, dtype="<f4").tobytes())
+                    # vector first, then the slot: readers never see a slot without data
+                    self.SLOT.pack_into(self._idx, off, row + 1, prefix)
+                    return
+            # probe window full: leave this vector in the in-process tier only
+
+    def close(self):
+        self._idx.close()
+        self._idx_file.close()
+        with self._map_lock:
+            if self._vec_map is not None:
+                self._vec_map.close()
+                self._vec_map = None
+
+class EmbeddingCache:
+    """In-process LRU (bounded by bytes) with an optional shared disk tier."""
+
+    def __init__(self, max_bytes=64 << 20, disk_path=None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._lru = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _open_disk_stores(self):
+        """Disk stores by dimension (caller holds self._lock); existing ones, e.g. from other processes, are opened on first use."""
+        if self._disk is None:
+            self._disk = {}
+            if self.disk_path and os.path.isdir(self.disk_path):
+                for name in os.listdir(self.disk_path):
+                    m = re.fullmatch(r"emb_(\d+)\.idx", name)
+                    if m:
+                        dim = int(m.group(1))
+                        self._disk[dim] = DiskEmbeddingStore(self.disk_path, dim)
+        return self._disk
+
+    def _disk_stores(self):
+        # under the lock: two threads must not both open (and one leak) the store mmaps
+        with self._lock:
+            return list(self._open_disk_stores().values())
+
+    def _disk_store(self, dim):
+        if not self.disk_path:
+            return None
+        with self._lock:
+            stores = self._open_disk_stores()
+            store = stores.get(dim)
+            if store is None:
+                store = stores[dim] = DiskEmbeddingStore(self.disk_path, dim)
+        return store
+
+    def _lookup(self, key):
+        with self._lock:
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vec
+        for store in self._disk_stores() if self.disk_path else ():
+            vec = store.get(key)
+            if vec is not None:
+                self._remember(key, vec)
+                with self._lock:
+                    self.disk_hits += 1
+                return vec
+        return None
+
+    def _remember(self, key, vec):
+        with self._lock:
+            if key in self._lru or vec.nbytes > self.max_bytes:
+                return
+            self._lru[key] = vec
+            self._bytes += vec.nbytes
+            while self._bytes > self.max_bytes:
+                _, old = self._lru.popitem(last=False)
+                self._bytes -= old.nbytes
+
+    def _store(self, key, vec):
+        self._remember(key, vec)
+        store = self._disk_store(vec.shape[0])
+        if store is not None:
+            store.put(key, vec)
+
+    def get_many(self, texts, model_id, compute_many):
+        """
+        Vectors for texts (float64 rows); compute_many(list_of_normalized_texts)
+        is called once with the misses only.
+        """
+        norm = [normalize_text(t) for t in texts]
+        keys = [cache_key(t, model_id) for t in norm]
+        out = [self._lookup(k) for k in keys]
+        missing = [i for i, v in enumerate(out) if v is None]
+        if missing:
+            # the same text may repeat inside one batch: compute it once
+            first = {}
+            for i in missing:
+                first.setdefault(keys[i], i)
+            todo = list(first.values())
+            computed = np.asarray(compute_many([norm[i] for i in todo]), dtype=np.float32)
+            with self._lock:
+                self.misses += len(todo)
+                self.hits += len(missing) - len(todo)
+            for i, vec in zip(todo, computed):
+                self._store(keys[i], vec)
+                first[keys[i]] = vec
+            for i in missing:
+                out[i] = first[keys[i]]
+        return np.stack(out).astype(float) if out else np.zeros((0, 0))
+
+    def get(self, text, model_id, compute):
+        return self.get_many([text], model_id, lambda ts: [compute(ts[0])])[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._lru),
+                "bytes": self._bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
@@ -3,23 +3,73 @@
 Execution Guard stub: validate decision_record through validators.
 This is a starter implementation — replace signature checks and validators with real ones.
 """
+import asyncio
+import threading
+import time
+
 from compute_aav import compute_aav
-from ai_pipeline import process_decision
+from ai_pipeline import evaluate_decision, evaluate_decision_batch, log_decision
+from signatures import generate_keypair, sign_decision, verification_pool, verify_decision, verify_decisions
 
 MIN_AAV = 0.65
 MIN_FINAL = 0.60
 SIM_FAIL_RATE_MAX = 0.25
 SEK_MAX = 0.30
 
-def verify_signatures(decision):
-    # Placeholder: in production verify ed25519 / ecdsa signatures
-    return "signatures" in decision and len(decision["signatures"])>0
+def verify_signatures(decision, keyring=None):
+    # ed25519 over the decision without its signatures, keys from the trusted keyring only
+    # (no keyring = fail closed); results cached (see signatures.py)
+    return verify_decision(decision, keyring=keyring)
+
+class EvaluationContext:
+    """
+    Per-decision values shared by all validators, each computed at most once:
+    AAV, and the AI evaluation (features, AI score, final score) that reuses it.
+    Thread-safe, so the concurrent validators of execution_guard_async share it too.
+    """
+
+    def __init__(self, decision, model=None, calibrator=None, weights=None, alpha=0.7):
+        self.decision = decision
+        self.model = model
+        self.calibrator = calibrator
+        self.weights = weights or [1.0]*8
+        self.alpha = alpha
+        self._aav = None
+        self._evaluation = None
+        self._aav_lock = threading.Lock()
+        self._evaluation_lock = threading.Lock()
+
+    @property
+    def aav(self):
+        if self._aav is None:
+            with self._aav_lock:
+                if self._aav is None:
+                    self._aav = compute_aav(self.weights, self.decision.get("scores", []))
+        return self._aav
+
+    @property
+    def evaluation(self):
+        """ai_pipeline.evaluate_decision output (not logged)."""
+        if self._evaluation is None:
+            with self._evaluation_lock:
+                if self._evaluation is None:
+                    self._evaluation = evaluate_decision(
+                        self.decision, model=self.model, calibrator=self.calibrator,
+                        weights=self.weights, alpha=self.alpha, aav=self.aav,
+                    )
+        return self._evaluation
 
-def axiom_validator(decision, weights):
-    aav = compute_aav(weights, decision.get("scores", []))
+    @property
+    def evaluated(self):
+        return self._evaluation is not None
+
+def _axiom_result(aav):
     ok = aav >= MIN_AAV
     return {"name":"axiom","ok":ok,"blocking":True,"score":aav,"reason":f"AAV={aav:.3f}"}
 
+def axiom_validator(decision, weights, ctx=None):
+    return _axiom_result(ctx.aav if ctx is not None else compute_aav(weights, decision.get("scores", [])))
+
 def simulation_validator(decision):
     # Placeholder heuristic for simulation failure rate
     fail_rate = 0.12
@@ -32,8 +82,12 @@ def sek_validator(decision):
     ok = sek <= SEK_MAX
     return {"name":"sek","ok":ok,"blocking":True,"score":1-sek,"reason":f"sek={sek:.3f}"}
 
-def ai_risk_validator(decision, model=None, calibrator=None, weights=None):
-    out, _, _ = process_decision(decision, model=model, calibrator=calibrator, weights=weights)
+def ai_risk_validator(decision, model=None, calibrator=None, weights=None, ctx=None):
+    # no logging here: the guard logs once, after the verdict
+    ctx = ctx or EvaluationContext(decision, model=model, calibrator=calibrator, weights=weights)
+    return _ai_risk_result(ctx.evaluation)
+
+def _ai_risk_result(out):
     final = out.get("final_score", 0.0)
     ai_cal = out.get("ai_calibrated", 0.0)
     ok = final >= MIN_FINAL and ai_cal >= 0.2
@@ -43,30 +97,225 @@ def aggregate_results(results):
     from datetime import datetime
     return {"timestamp":datetime.utcnow().isoformat()+"Z","results":results,"overall_ok":all(r["ok"] for r in results)}
 
-def execution_guard(decision, model=None, calibrator=None, weights=None):
-    if not verify_signatures(decision):
+def _verdict(blocked, report):
+    if blocked:
+        # store block record, anchor later
+        return {"executed":False,"reason":"BLOCKED_BY_VALIDATOR","report":report}
+    tx = {"txid":"demo-tx-123"}
+    return {"executed":True,"tx":tx,"report":report}
+
+def log_verdict(ctx, verdict, logdir="./logs", log_writer=None):
+    """
+    Single log write per guarded decision: the AI evaluation record plus the
+    guard outcome. Adds verdict["log"] = {"location", "sha256"}; nothing is
+    written if the evaluation never ran (short-circuited) or logging is off.
+    """
+    if not ctx.evaluated or (logdir is None and log_writer is None):
+        return verdict
+    record = _guard_record(ctx.evaluation, verdict)
+    location, h = log_decision(logdir, record, writer=log_writer)
+    verdict["log"] = {"location":location,"sha256":h}
+    return verdict
+
+def _guard_record(evaluation, verdict):
+    return dict(evaluation, guard={"executed":verdict["executed"],"reason":verdict.get("reason")})
+
+def execution_guard(decision, model=None, calibrator=None, weights=None, logdir="./logs", log_writer=None, keyring=None):
+    """
+    logdir=None (and no log_writer) disables the decision log write.
+    keyring: trusted {actor_id: pubkey hex} (signatures.load_keyring); without it every decision is rejected.
+    """
+    if not verify_signatures(decision, keyring=keyring):
         return {"executed":False,"reason":"INVALID_SIGNATURES"}
+    ctx = EvaluationContext(decision, model=model, calibrator=calibrator, weights=weights)
     validators = [
-        axiom_validator(decision, weights or [1.0]*8),
-        ai_risk_validator(decision, model=model, calibrator=calibrator, weights=weights),
+        axiom_validator(decision, ctx.weights, ctx=ctx),
+        ai_risk_validator(decision, ctx=ctx),
         simulation_validator(decision),
         sek_validator(decision),
     ]
     blocked = any((not v["ok"]) and v.get("blocking",False) for v in validators)
-    report = aggregate_results(validators)
-    if blocked:
-        # store block record, anchor later
-        return {"executed":False,"reason":"BLOCKED_BY_VALIDATOR","report":report}
-    tx = {"txid":"demo-tx-123"}
-    return {"executed":True,"tx":tx,"report":report}
+    verdict = _verdict(blocked, aggregate_results(validators))
+    return log_verdict(ctx, verdict, logdir=logdir, log_writer=log_writer)
+
+# Per-validator timeouts (seconds) for execution_guard_async
+VALIDATOR_TIMEOUTS = {"axiom": 1.0, "ai_risk": 5.0, "simulation": 10.0, "sek": 5.0}
+
+def _validator_calls(decision, ctx):
+    return [
+        ("axiom", lambda: axiom_validator(decision, ctx.weights, ctx=ctx)),
+        ("ai_risk", lambda: ai_risk_validator(decision, ctx=ctx)),
+        ("simulation", lambda: simulation_validator(decision)),
+        ("sek", lambda: sek_validator(decision)),
+    ]
+
+async def _run_validator(name, fn, timeout):
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(fn), timeout)
+    except asyncio.TimeoutError:
+        return {"name":name,"ok":False,"blocking":True,"score":None,"reason":f"TIMEOUT>{timeout}s"}
+    except Exception as e:
+        return {"name":name,"ok":False,"blocking":True,"score":None,"reason":f"ERROR: {e}"}
+
+async def execution_guard_async(decision, model=None, calibrator=None, weights=None, timeouts=None,
+                                logdir="./logs", log_writer=None, keyring=None):
+    """
+    Async execution guard: independent validators run concurrently (threads),
+    each with its own timeout (a timeout or exception counts as a blocking
+    failure). The first blocking failure cancels the remaining validators,
+    which are reported as skipped. Returns the same shape as execution_guard.
+    """
+    if not verify_signatures(decision, keyring=keyring):
+        return {"executed":False,"reason":"INVALID_SIGNATURES"}
+    limits = {**VALIDATOR_TIMEOUTS, **(timeouts or {})}
+    ctx = EvaluationContext(decision, model=model, calibrator=calibrator, weights=weights)
+    calls = _validator_calls(decision, ctx)
+    tasks = {asyncio.ensure_future(_run_validator(name, fn, limits.get(name))): name for name, fn in calls}
+    results = {}
+    pending = set(tasks)
+    blocked = False
+    while pending and not blocked:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            r = task.result()
+            results[tasks[task]] = r
+            blocked = blocked or ((not r["ok"]) and r.get("blocking",False))
+    for task in pending:
+        task.cancel()
+        results[tasks[task]] = {"name":tasks[task],"ok":False,"blocking":False,"score":None,"reason":"SKIPPED","skipped":True}
+    verdict = _verdict(blocked, aggregate_results([results[name] for name, _ in calls]))
+    return await asyncio.to_thread(log_verdict, ctx, verdict, logdir, log_writer)
+
+class GuardStats:
+    """Throughput / latency counters for execution_guard_batch."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.decisions = 0
+        self.executed = 0
+        self.blocked = 0
+        self.invalid = 0
+        self.chunk_latencies = []
+
+    def add(self, verdicts, elapsed):
+        self.decisions += len(verdicts)
+        for v in verdicts:
+            if v["executed"]:
+                self.executed += 1
+            elif v["reason"] == "INVALID_SIGNATURES":
+                self.invalid += 1
+            else:
+                self.blocked += 1
+        self.chunk_latencies.append(elapsed)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        lat = sorted(self.chunk_latencies)
+        pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000 if lat else 0.0
+        busy = sum(lat)
+        return {
+            "decisions": self.decisions,
+            "executed": self.executed,
+            "blocked": self.blocked,
+            "invalid_signatures": self.invalid,
+            "elapsed_s": round(elapsed, 3),
+            "decisions_per_s": round(self.decisions / elapsed, 1) if elapsed > 0 else 0.0,
+            "per_decision_us": round(busy / self.decisions * 1e6, 1) if self.decisions else 0.0,
+            "chunk_latency_ms": {"p50": round(pick(0.5), 3), "p99": round(pick(0.99), 3), "max": round(pick(1.0), 3)},
+        }
+
+def _malformed_reason(decision, n_weights):
+    """Why a decision cannot be evaluated (scores / reason / delta_aav shape), or None."""
+    scores = decision.get("scores")
+    if not isinstance(scores, (list, tuple)) or len(scores) != n_weights:
+        return f"scores must be a list of {n_weights} numbers"
+    try:
+        [float(x) for x in scores]
+        float(decision.get("delta_aav", 0.0))
+    except (TypeError, ValueError):
+        return "scores / delta_aav must be numbers"
+    if not isinstance(decision.get("reason", ""), str):
+        return "reason must be a string"
+    return None
+
+def _malformed_verdict(reason):
+    # like a validator exception in execution_guard_async: a blocking failure of this decision only
+    result = {"name":"input","ok":False,"blocking":True,"score":None,"reason":f"ERROR: {reason}"}
+    return _verdict(True, aggregate_results([result]))
+
+def _guard_chunk(chunk, model, calibrator, weights, alpha, logdir, log_writer, keyring, sig_workers, sig_pool):
+    signed = verify_decisions(chunk, keyring=keyring, workers=sig_workers, pool=sig_pool)
+    verdicts = [{"executed":False,"reason":"INVALID_SIGNATURES"} for _ in chunk]
+    n_weights = len(weights or [1.0]*8)
+    valid = []
+    for i, ok in enumerate(signed):
+        problem = _malformed_reason(chunk[i], n_weights) if ok else None
+        if problem is not None:
+            verdicts[i] = _malformed_verdict(problem)
+        elif ok:
+            valid.append(i)
+    evaluations = evaluate_decision_batch([chunk[i] for i in valid], model=model, calibrator=calibrator, weights=weights, alpha=alpha)
+    for i, out in zip(valid, evaluations):
+        validators = [
+            _axiom_result(out["aav"]),
+            _ai_risk_result(out),
+            simulation_validator(chunk[i]),
+            sek_validator(chunk[i]),
+        ]
+        blocked = any((not v["ok"]) and v.get("blocking",False) for v in validators)
+        verdicts[i] = _verdict(blocked, aggregate_results(validators))
+    if evaluations and (logdir is not None or log_writer is not None):
+        records = [_guard_record(out, verdicts[i]) for i, out in zip(valid, evaluations)]
+        if log_writer is not None:
+            logged = log_writer.append_many(records)
+        else:
+            logged = [log_decision(logdir, r) for r in records]
+        for i, (location, h) in zip(valid, logged):
+            verdicts[i]["log"] = {"location":location,"sha256":h}
+    return verdicts
+
+def execution_guard_batch(decisions, model=None, calibrator=None, weights=None, alpha=0.7, chunk_size=1024,
+                          logdir="./logs", log_writer=None, stats=None, keyring=None, sig_workers=None, sig_pool=None):
+    """
+    Guard a stream of decisions in chunks: one batched signature check
+    (sig_workers > 1: process pool - sig_pool, else one created for the whole
+    run and shut down at its end), one vectorized
+    evaluation per chunk (AAV, features, AI score via evaluate_decision_batch),
+    the remaining validators per record and bulk logging (log_writer.append_many).
+    Yields (decision, verdict) in input order; verdicts match execution_guard.
+    A malformed decision (see _malformed_reason) gets a BLOCKED_BY_VALIDATOR
+    verdict with an "input" error and is not logged; the rest of its chunk is guarded.
+    stats: optional GuardStats updated per chunk.
+    """
+    own_pool = verification_pool(sig_workers) if sig_pool is None else None
+    pool = sig_pool or own_pool
+    chunk = []
+    def flush():
+        t0 = time.perf_counter()
+        verdicts = _guard_chunk(chunk, model, calibrator, weights, alpha, logdir, log_writer, keyring, sig_workers, pool)
+        if stats is not None:
+            stats.add(verdicts, time.perf_counter() - t0)
+        return list(zip(chunk, verdicts))
+    try:
+        for d in decisions:
+            chunk.append(d)
+            if len(chunk) >= chunk_size:
+                yield from flush()
+                chunk = []
+        if chunk:
+            yield from flush()
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
 
 if __name__ == "__main__":
     demo = {
         "id":"demo-001",
         "scores":[0.82,0.78,0.9,0.7,0.85,0.8,0.88,0.9],
         "reason":"Demo decision",
-        "signatures":[{"actor_id":"ccc1","sig":"stub"}],
         "meta":{}
     }
-    res = execution_guard(demo)
+    private_key, public_key = generate_keypair()
+    sign_decision(demo, private_key, "ccc1")
+    res = execution_guard(demo, keyring={"ccc1": public_key})
     print(res)
@@ -0,0 +1,207 @@
+# guard_service.py
+"""
+Local execution-guard service: a small asyncio HTTP/1.1 server (TCP or Unix
+socket) so a gateway can submit decisions to a long-running process.
+
+Endpoints:
+  POST /guard   body: decision JSON, or {"decision": {...}}
+                -> execution_guard_async verdict (JSON)
+                AAV weights are server configuration (--weights); a request
+                carrying "weights" is rejected, the signature does not cover them.
+  GET  /health  -> {"ok": true, "model": bool, "embeddings": bool}
+
+Connections are kept alive unless the client sends "Connection: close".
+Bodies over MAX_BODY get 413, more than MAX_HEADERS headers or
+MAX_HEADER_BYTES of them 431, and an error while guarding 500 (JSON error).
+
+Usage:
+  python guard_service.py --port 8787 --keyring config/keyring.json
+  python guard_service.py --unix /tmp/axiom_guard.sock --model model.joblib
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from ai_pipeline import load_model, warm_up
+from decision_log import GUARD_LOGDIR, SegmentedLogWriter
+from execution_guard import execution_guard_async
+from signatures import load_keyring
+
+MAX_BODY = 1 << 20
+MAX_HEADERS = 100
+MAX_HEADER_BYTES = 16 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+class GuardService:
+    def __init__(self, model=None, calibrator=None, weights=None, timeouts=None, logdir=GUARD_LOGDIR, log_writer=None,
+                 keyring=None):
+        self.model = model
+        self.calibrator = calibrator
+        self.weights = weights
+        self.timeouts = timeouts
+        self.logdir = logdir
+        self.log_writer = log_writer
+        self.keyring = keyring
+        self.embeddings = False
+
+    async def guard(self, payload):
+        decision = payload["decision"] if isinstance(payload.get("decision"), dict) else payload
+        return await execution_guard_async(
+            decision, model=self.model, calibrator=self.calibrator, weights=self.weights, timeouts=self.timeouts,
+            logdir=self.logdir, log_writer=self.log_writer, keyring=self.keyring,
+        )
+
+    async def dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"ok": True, "model": self.model is not None, "embeddings": self.embeddings}
+        if path != "/guard":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "decision must be a JSON object"}
+        if "weights" in payload:
+            return 400, {"error": "weights are set by the server configuration, not per request"}
+        return 200, await self.guard(payload)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, False)
+                    break
+                headers = await self._read_headers(reader)
+                if headers is None:
+                    await self._respond(writer, 431, {"error": f"over {MAX_HEADERS} headers or {MAX_HEADER_BYTES} bytes"},
+                                        False)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": f"body over {MAX_BODY} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, result = await self.dispatch(method.upper(), path.split("?", 1)[0], body)
+                except Exception as e:
+                    # a failed log write or validator still gets an answer, not a dropped connection
+                    status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader):
+        """Header dict (lower-case names), or None when over MAX_HEADERS / MAX_HEADER_BYTES."""
+        headers, count, total = {}, 0, 0
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:  # line over the stream limit
+                return None
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            count, total = count + 1, total + len(line)
+            if count > MAX_HEADERS or total > MAX_HEADER_BYTES:
+                return None
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _respond(writer, status, obj, keep_alive):
+        data = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+async def serve(service, host="127.0.0.1", port=8787, unix_path=None):
+    # load the embedding model once, before taking traffic
+    service.embeddings = await asyncio.to_thread(warm_up)
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+        print(f"Execution guard listening on unix:{unix_path}")
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f"Execution guard listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    p = argparse.ArgumentParser(description="Local execution-guard service (HTTP over TCP or Unix socket)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8787)
+    p.add_argument("--unix", help="Unix socket path (instead of TCP)")
+    p.add_argument("--model", help="joblib model path")
+    p.add_argument("--calibrator", help="joblib calibrator path")
+    p.add_argument("--weights", help="comma-separated axiom weights")
+    p.add_argument("--timeout", action="append", default=[], metavar="NAME=SECONDS",
+                   help="per-validator timeout override, e.g. --timeout ai_risk=2.5")
+    p.add_argument("--logdir", default=GUARD_LOGDIR, help=f"decision log directory (segmented log, default: {GUARD_LOGDIR})")
+    p.add_argument("--no-log", action="store_true", help="do not log guarded decisions")
+    p.add_argument("--fsync-every", type=int, default=1,
+                   help="fsync the decision log every N records (default 1: a returned log.location is on disk; "
+                        "0 = flush to the OS only)")
+    p.add_argument("--fsync-interval", type=float, default=None,
+                   help="also fsync at the first append after this many seconds (group commit with --fsync-every N)")
+    p.add_argument("--keyring", help="trusted JSON {actor_id: ed25519 pubkey hex} "
+                                     "(default: $AXIOM_KEYRING or config/keyring.json; the service refuses to start without one)")
+    args = p.parse_args()
+
+    model = load_model(args.model) if args.model else None
+    calibrator = None
+    if args.calibrator:
+        from joblib import load
+        calibrator = load(args.calibrator)
+    weights = [float(w) for w in args.weights.split(",")] if args.weights else None
+    timeouts = {}
+    for item in args.timeout:
+        name, _, seconds = item.partition("=")
+        timeouts[name] = float(seconds)
+    # trusted keys only: keys embedded in a request are never used
+    try:
+        keyring = load_keyring(args.keyring)
+    except (OSError, ValueError) as e:
+        p.error(str(e))
+    log_writer = None if args.no_log else SegmentedLogWriter(
+        args.logdir, fsync_every=args.fsync_every, fsync_interval=args.fsync_interval)
+    service = GuardService(model=model, calibrator=calibrator, weights=weights, timeouts=timeouts,
+                           logdir=None if args.no_log else args.logdir, log_writer=log_writer,
+                           keyring=keyring)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log_writer is not None:
+            log_writer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# merkle_store.py
+"""
+Persistent append-only Merkle tree with inclusion proofs.
+
+Layout of a store directory:
+  meta.json       - {"mode": "hex" | "compact"}
+  level_00.bin    - leaf digests (32 raw bytes each)
+  level_NN.bin    - digests of *complete* nodes on level NN (subtree of 2**NN leaves)
+
+Only complete nodes are stored, so they never change after being written.
+Nodes on the right edge of a tree that are not complete (odd counts handled by
+the duplicate-last-node rule) are derived on demand in O(log n), which also
+allows proofs against any earlier tree size.
+
+Hex mode reproduces anchor.merkle_root_from_hashes over hex leaves (e.g. the
+sha256 returned by ai_pipeline.log_decision); compact mode matches
+MerkleAccumulator(compact=True).
+"""
+import hashlib
+import json
+import mmap
+import os
+
+from anchor import DIGEST_SIZE, node_digest
+
+def _node_hex_mode(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256((left.hex() + right.hex()).encode()).digest()
+
+def _node_fn(compact):
+    return node_digest if compact else _node_hex_mode
+
+def _to_digest(leaf) -> bytes:
+    if isinstance(leaf, str):
+        leaf = bytes.fromhex(leaf)
+    if len(leaf) != DIGEST_SIZE:
+        raise ValueError("leaf must be a 32-byte digest (or 64 hex chars)")
+    return bytes(leaf)
+
+class MerkleTreeStore:
+    """
+    On-disk Merkle tree: amortized O(1) (worst O(log n)) append, O(log n)
+    root and inclusion proof. Level files are read through mmap.
+    """
+
+    def __init__(self, path, compact=None):
+        """compact=None keeps the mode of an existing store (hex for a new one)."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                stored = json.load(f).get("mode", "hex") == "compact"
+            if compact is not None and compact != stored:
+                raise ValueError(f"Store {path} uses {'compact' if stored else 'hex'} mode")
+            compact = stored
+        else:
+            compact = bool(compact)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"mode": "compact" if compact else "hex"}, f)
+        self.compact = compact
+        self._node = _node_fn(compact)
+        self._writers = {}
+        self._maps = {}
+        # counts of complete nodes per level + pending left siblings (odd counts)
+        self._counts = []
+        self._pending = {}
+        level = 0
+        while os.path.exists(self._level_path(level)):
+            count = os.path.getsize(self._level_path(level)) // DIGEST_SIZE
+            self._counts.append(count)
+            level += 1
+        self._repair()
+        for level, count in enumerate(self._counts):
+            if count % 2:
+                self._pending[level] = self._read(level, count - 1)
+
+    def _repair(self):
+        """Finish parents missing after an interrupted append; drop torn digests."""
+        for level, count in enumerate(self._counts):
+            path = self._level_path(level)
+            if os.path.getsize(path) != count * DIGEST_SIZE:
+                os.truncate(path, count * DIGEST_SIZE)
+        level = 0
+        while level < len(self._counts):
+            have = self._counts[level + 1] if level + 1 < len(self._counts) else 0
+            for k in range(have, self._counts[level] // 2):
+                self._write(level + 1, self._node(self._read(level, 2 * k), self._read(level, 2 * k + 1)))
+            level += 1
+        self.flush()
+
+    # -- files ---------------------------------------------------------------
+
+    def _level_path(self, level):
+        return os.path.join(self.path, f"level_{level:02d}.bin")
+
+    def _write(self, level, digest):
+        f = self._writers.get(level)
+        if f is None:
+            f = self._writers[level] = open(self._level_path(level), "ab")
+        f.write(digest)
+        if level == len(self._counts):
+            self._counts.append(0)
+        self._counts[level] += 1
+
+    def flush(self):
+        for f in self._writers.values():
+            f.flush()
+
+    def _read(self, level, index):
+        self.flush()
+        end = (index + 1) * DIGEST_SIZE
+        mm = self._maps.get(level)
+        if mm is None or len(mm) < end:
+            if mm is not None:
+                mm.close()
+            with open(self._level_path(level), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[level] = mm
+        return mm[index * DIGEST_SIZE:end]
+
+    def close(self):
+        self.flush()
+        for f in self._writers.values():
+            f.close()
+        for mm in self._maps.values():
+            mm.close()
+        self._writers.clear()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- append ----------------------------------------------------------------
+
+    def __len__(self):
+        return self._counts[0] if self._counts else 0
+
+    def append(self, leaf):
+        """Append one leaf (hex or 32 raw bytes); returns its index."""
+        node, level = _to_digest(leaf), 0
+        index = len(self)
+        while True:
+            self._write(level, node)
+            left = self._pending.pop(level, None)
+            if left is None:
+                self._pending[level] = node
+                break
+            node = self._node(left, node)
+            level += 1
+        return index
+
+    def extend(self, leaves):
+        indices = [self.append(leaf) for leaf in leaves]
+        self.flush()
+        return indices
+
+    # -- read ------------------------------------------------------------------
+
+    def _check_size(self, size):
+        size = len(self) if size is None else size
+        if not 0 < size <= len(self):
+            raise ValueError(f"tree size must be in 1..{len(self)}")
+        return size
+
+    def _node_at(self, level, index, size):
+        """Node (level, index) of the tree over the first `size` leaves."""
+        if (index + 1) << level <= size:
+            return self._read(level, index)
+        # incomplete right-edge node: children on level-1
+        width = -(-size >> (level - 1))  # ceil(size / 2**(level-1))
+        left = self._node_at(level - 1, 2 * index, size)
+        right = self._node_at(level - 1, 2 * index + 1, size) if 2 * index + 1 < width else left
+        return self._node(left, right)
+
+    def root(self, size=None):
+        """Hex root of the tree over the first `size` leaves (default: all)."""
+        if not len(self):
+            return None
+        size = self._check_size(size)
+        height = (size - 1).bit_length()
+        return self._node_at(height, 0, size).hex()
+
+    def proof(self, index, size=None):
+        """Inclusion proof for leaf `index` in the tree over the first `size` leaves."""
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise ValueError(f"leaf index must be in 0..{size - 1}")
+        path = []
+        width, i, level = size, index, 0
+        while width > 1:
+            sibling = i ^ 1
+            if sibling < width:
+                digest = self._node_at(level, sibling, size)
+            else:
+                digest = self._node_at(level, i, size)  # duplicated last node
+            path.append({"side": "left" if sibling < i else "right", "hash": digest.hex()})
+            width = (width + 1) // 2
+            i //= 2
+            level += 1
+        return {
+            "mode": "compact" if self.compact else "hex",
+            "leaf_index": index,
+            "tree_size": size,
+            "leaf": self._read(0, index).hex(),
+            "path": path,
+            "root": self.root(size),
+        }
+
+def path_sides(index, size):
+    """Sibling sides ("left" / "right") of the inclusion path of leaf `index` in a tree of `size` leaves."""
+    sides, width = [], size
+    while width > 1:
+        sides.append("left" if index & 1 else "right")
+        width = (width + 1) // 2
+        index //= 2
+    return sides
+
+def verify_proof(proof, root, leaf=None):
+    """
+    Verify an inclusion proof produced by MerkleTreeStore.proof against an
+    anchored root (hex). The root stored in the proof is not trusted: a proof
+    only shows inclusion in a root obtained independently of it.
+    leaf: optional expected leaf (hex); default: the one in the proof.
+    The path sides must match leaf_index / tree_size, so those are bound too.
+    """
+    if not root:
+        raise ValueError("verify_proof needs the anchored root")
+    index, size = proof["leaf_index"], proof["tree_size"]
+    if not (isinstance(index, int) and isinstance(size, int) and 0 <= index < size):
+        return False
+    if [step["side"] for step in proof["path"]] != path_sides(index, size):
+        return False
+    node_fn = _node_fn(proof.get("mode") == "compact")
+    node = _to_digest(leaf or proof["leaf"])
+    if leaf is not None and _to_digest(proof["leaf"]) != node:
+        return False
+    for step in proof["path"]:
+        sibling = _to_digest(step["hash"])
+        node = node_fn(sibling, node) if step["side"] == "left" else node_fn(node, sibling)
+    return node.hex() == root.lower()
@@ -0,0 +1,237 @@
+# online_stats.py
+"""
+Single-pass, mergeable statistics for AAV series.
+
+OnlineStats keeps count / mean / variance (Welford, merged with Chan's
+formula), min / max, per-status counts and a TDigest for quantiles
+(p50 / p95 / p99) in bounded memory. Accumulators built on separate shards
+or processes (they pickle) combine with merge(); to_dict() / from_dict()
+give a JSON form.
+
+TDigest is a merging t-digest with the k1 (arcsine) scale function: centroids
+near the tails stay small, so high quantiles stay accurate. While no
+centroids have been merged (n <= compression, roughly), quantiles are exact
+and match numpy's linear interpolation.
+"""
+import math
+from collections import Counter
+
+def _is_missing(v):
+    return v is None or (isinstance(v, float) and math.isnan(v))
+
+class TDigest:
+    """Approximate quantiles in O(compression) memory."""
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self._centroids = []  # [(mean, weight)], sorted by mean after _compress
+        self._buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(w for _, w in points)
+        out = []
+        mean, weight = points[0]
+        before = 0.0
+        k_lo = self._k(0.0)
+        for m, w in points[1:]:
+            if self._k((before + weight + w) / total) - k_lo <= 1.0:
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                out.append((mean, weight))
+                before += weight
+                k_lo = self._k(before / total)
+                mean, weight = m, w
+        out.append((mean, weight))
+        self._centroids = out
+
+    def add(self, value, weight=1.0):
+        value = float(value)
+        self._buffer.append((value, float(weight)))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def add_many(self, values):
+        values = [float(v) for v in values]
+        if not values:
+            return
+        self._buffer.extend((v, 1.0) for v in values)
+        self.count += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self._buffer.extend(other._centroids)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def centroids(self):
+        self._compress()
+        return list(self._centroids)
+
+    def quantile(self, q):
+        """Value at quantile q in [0, 1]; None when empty."""
+        cents = self.centroids()
+        if not cents:
+            return None
+        n = len(cents)
+        if n == 1:
+            return cents[0][0]
+        if all(w == 1.0 for _, w in cents):
+            # exact: linear interpolation between order statistics
+            pos = q * (n - 1)
+            i = min(int(pos), n - 2)
+            return cents[i][0] + (pos - i) * (cents[i + 1][0] - cents[i][0])
+        t = q * self.count
+        first_w = cents[0][1]
+        if t < first_w / 2:
+            return self.min + (cents[0][0] - self.min) * t / (first_w / 2)
+        cum = 0.0
+        for (m, w), (m_next, w_next) in zip(cents, cents[1:]):
+            left = cum + w / 2
+            right = cum + w + w_next / 2
+            if t <= right:
+                return m + (t - left) / (right - left) * (m_next - m)
+            cum += w
+        last_m, last_w = cents[-1]
+        tail = self.count - last_w / 2
+        if t >= self.count:
+            return self.max
+        return last_m + (self.max - last_m) * (t - tail) / (last_w / 2)
+
+    def to_dict(self):
+        return {"compression": self.compression, "centroids": self.centroids(),
+                "count": self.count, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, d):
+        td = cls(d["compression"])
+        td._centroids = [tuple(c) for c in d["centroids"]]
+        td.count, td.min, td.max = d["count"], d["min"], d["max"]
+        return td
+
+class OnlineStats:
+    """Count, mean, variance, min/max, quantiles and per-status counts in one pass."""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, compression=100):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.missing = 0
+        self.status_counts = Counter()
+        self.digest = TDigest(compression)
+
+    def add(self, value, status=None):
+        """Add one value (None / NaN counts as missing); status is counted either way."""
+        if status is not None and not _is_missing(status):
+            self.status_counts[str(status)] += 1
+        if _is_missing(value):
+            self.missing += 1
+            return
+        x = float(value)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = x if self.min is None or x < self.min else self.min
+        self.max = x if self.max is None or x > self.max else self.max
+        self.digest.add(x)
+
+    def add_many(self, values, statuses=None):
+        """Add a chunk (e.g. a pandas column): chunk moments are merged in one step."""
+        if statuses is not None:
+            self.status_counts.update(str(s) for s in statuses if not _is_missing(s))
+        vals = []
+        for v in values:
+            if _is_missing(v):
+                self.missing += 1
+            else:
+                vals.append(float(v))
+        if not vals:
+            return
+        n = len(vals)
+        mean = math.fsum(vals) / n
+        m2 = math.fsum((v - mean) ** 2 for v in vals)
+        self._merge_moments(n, mean, m2, min(vals), max(vals))
+        self.digest.add_many(vals)
+
+    def _merge_moments(self, n, mean, m2, mn, mx):
+        total = self.count + n
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = mn if self.min is None or mn < self.min else self.min
+        self.max = mx if self.max is None or mx > self.max else self.max
+
+    def merge(self, other):
+        """Combine another accumulator (e.g. from another shard) into this one."""
+        if other.count:
+            self._merge_moments(other.count, other.mean, other._m2, other.min, other.max)
+            self.digest.merge(other.digest)
+        self.missing += other.missing
+        self.status_counts.update(other.status_counts)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1); None for fewer than 2 values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def std(self):
+        var = self.variance
+        return math.sqrt(var) if var is not None else None
+
+    def quantile(self, q):
+        return self.digest.quantile(q)
+
+    def summary(self):
+        out = {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean if self.count else None,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+        }
+        for q in self.QUANTILES:
+            out[f"p{int(q * 100)}"] = self.quantile(q)
+        out["status_counts"] = dict(self.status_counts)
+        return out
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self._m2, "min": self.min, "max": self.max,
+                "missing": self.missing, "status_counts": dict(self.status_counts), "digest": self.digest.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls(d["digest"]["compression"])
+        s.count, s.mean, s._m2, s.min, s.max = d["count"], d["mean"], d["m2"], d["min"], d["max"]
+        s.missing = d["missing"]
+        s.status_counts = Counter(d["status_counts"])
+        s.digest = TDigest.from_dict(d["digest"])
+        return s
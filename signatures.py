@@ -0,0 +1,239 @@
+# signatures.py
+"""
+Ed25519 signatures over decision records.
+
+A decision is signed over the sha256 of its canonical JSON without the
+"signatures" field; each entry of decision["signatures"] is
+  {"actor_id": ..., "pubkey": <hex 32 B>, "sig": <hex 64 B>}
+Verification is against a trusted keyring ({actor_id: pubkey hex}) only: the
+"pubkey" of an entry is informational and never trusted, entries of actors
+missing from the keyring are invalid, and without a keyring nothing verifies
+(anyone can sign with a key of their own). load_keyring() reads the keyring
+from a path, $AXIOM_KEYRING or config/keyring.json.
+
+Backends: PyNaCl (libsodium), else cryptography; both are optional imports and
+a missing backend raises RuntimeError on first use (fail closed, loudly).
+
+Neither backend exposes ed25519 batch equations, so bulk verification is
+"batched" around them: duplicates are verified once, results are cached by
+(pubkey, message hash, signature), and misses can be spread over a process pool.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from nacl.signing import SigningKey as _NaclSigningKey, VerifyKey as _NaclVerifyKey
+    from nacl.exceptions import BadSignatureError as _NaclBadSignature
+except ImportError:
+    _NaclVerifyKey = None
+
+try:
+    from cryptography.exceptions import InvalidSignature as _CryptoInvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+except ImportError:
+    Ed25519PublicKey = None
+
+BACKEND = "nacl" if _NaclVerifyKey is not None else "cryptography" if Ed25519PublicKey is not None else None
+
+# below this many cache misses a process pool costs more than it saves
+POOL_MIN_ITEMS = 512
+
+DEFAULT_KEYRING = os.path.join("config", "keyring.json")
+
+def _require_backend():
+    if BACKEND is None:
+        raise RuntimeError("ed25519 verification needs PyNaCl or cryptography (pip install pynacl)")
+
+def decision_message(decision):
+    """sha256 of the canonical JSON of the decision without its signatures (the signed message)."""
+    body = {k: v for k, v in decision.items() if k != "signatures"}
+    j = json.dumps(body, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(j.encode("utf-8")).digest()
+
+def verify_one(pubkey, message, sig):
+    """Raw ed25519 verification (bytes in); False for malformed keys or signatures."""
+    _require_backend()
+    if len(pubkey) != 32 or len(sig) != 64:
+        return False
+    if BACKEND == "nacl":
+        try:
+            _NaclVerifyKey(pubkey).verify(message, sig)
+            return True
+        except (_NaclBadSignature, ValueError, TypeError):
+            return False
+    try:
+        Ed25519PublicKey.from_public_bytes(pubkey).verify(sig, message)
+        return True
+    except (_CryptoInvalidSignature, ValueError):
+        return False
+
+def _verify_chunk(items):
+    return [verify_one(pk, msg, sig) for pk, msg, sig in items]
+
+class SignatureCache:
+    """Thread-safe LRU of verification results keyed by (pubkey, message hash, signature)."""
+
+    def __init__(self, max_entries=1 << 18):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            ok = self._results.get(key)
+            if ok is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return ok
+
+    def put(self, key, ok):
+        with self._lock:
+            self._results[key] = ok
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._results)}
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+SIGNATURE_CACHE = SignatureCache()
+
+def verification_pool(workers):
+    """
+    Process pool for verify_many / verify_decisions (None for workers <= 1).
+    Create it once per run and shut it down at the end. Workers start from a
+    fresh interpreter (forkserver / spawn), not forked from a threaded caller.
+    """
+    if not workers or workers <= 1:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+
+def verify_many(items, cache=SIGNATURE_CACHE, workers=None, pool=None):
+    """
+    Verify (pubkey, message, sig) byte triples; returns a list of bools.
+    Cached and duplicate triples are verified once; with workers > 1 and at
+    least POOL_MIN_ITEMS misses, verification runs in a process pool: `pool`
+    (see verification_pool), else one created for this call.
+    """
+    items = [tuple(bytes(x) for x in item) for item in items]
+    results = [None] * len(items)
+    todo = {}
+    for i, key in enumerate(items):
+        ok = cache.get(key) if cache is not None else None
+        if ok is None:
+            todo.setdefault(key, []).append(i)
+        else:
+            results[i] = ok
+    keys = list(todo)
+    if workers and workers > 1 and len(keys) >= POOL_MIN_ITEMS:
+        size = -(-len(keys) // (workers * 4))
+        chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        if pool is None:
+            with verification_pool(workers) as own:
+                verified = [ok for part in own.map(_verify_chunk, chunks) for ok in part]
+        else:
+            verified = [ok for part in pool.map(_verify_chunk, chunks) for ok in part]
+    else:
+        verified = _verify_chunk(keys)
+    for key, ok in zip(keys, verified):
+        if cache is not None:
+            cache.put(key, ok)
+        for i in todo[key]:
+            results[i] = ok
+    return results
+
+def load_keyring(path=None):
+    """
+    Trusted {actor_id: pubkey hex} from path, else $AXIOM_KEYRING, else DEFAULT_KEYRING.
+    Raises FileNotFoundError / ValueError: a guard must not run without one.
+    """
+    path = path or os.environ.get("AXIOM_KEYRING") or DEFAULT_KEYRING
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"keyring not found: {path} (pass --keyring or set AXIOM_KEYRING)")
+    with open(path, "r", encoding="utf-8") as f:
+        keyring = json.load(f)
+    if not isinstance(keyring, dict) or not keyring:
+        raise ValueError(f"keyring must be a non-empty JSON object {{actor_id: pubkey hex}}: {path}")
+    for actor_id, pubkey in keyring.items():
+        if not isinstance(pubkey, str) or len(bytes.fromhex(pubkey)) != 32:
+            raise ValueError(f"invalid ed25519 public key for {actor_id!r} in {path}")
+    return keyring
+
+def _signature_items(decision, keyring):
+    """(pubkey, message, sig) triples of a decision; None if there is no keyring or an entry is malformed / unknown."""
+    if not keyring:
+        return None
+    sigs = decision.get("signatures")
+    if not isinstance(sigs, list) or not sigs:
+        return None
+    message = decision_message(decision)
+    items = []
+    for s in sigs:
+        try:
+            pubkey = keyring[s["actor_id"]]
+            items.append((bytes.fromhex(pubkey), message, bytes.fromhex(s["sig"])))
+        except (KeyError, TypeError, ValueError):
+            return None
+    return items
+
+def verify_decisions(decisions, keyring=None, cache=SIGNATURE_CACHE, workers=None, pool=None):
+    """
+    Signature check for many decisions in one batch: a decision is valid when
+    it has at least one signature, every signer is in the keyring and all
+    signatures verify against the keyring keys. keyring=None: nothing is valid.
+    workers / pool: as in verify_many. Returns a list of bools.
+    """
+    per_decision = [_signature_items(d, keyring) for d in decisions]
+    flat = [item for items in per_decision if items for item in items]
+    verified = iter(verify_many(flat, cache=cache, workers=workers, pool=pool))
+    out = []
+    for items in per_decision:
+        if not items:
+            out.append(False)
+            continue
+        oks = [next(verified) for _ in items]
+        out.append(all(oks))
+    return out
+
+def verify_decision(decision, keyring=None, cache=SIGNATURE_CACHE):
+    return verify_decisions([decision], keyring=keyring, cache=cache)[0]
+
+def generate_keypair():
+    """(private key hex, public key hex) - for tests, demos and benchmarks."""
+    _require_backend()
+    if BACKEND == "nacl":
+        sk = _NaclSigningKey.generate()
+        return bytes(sk).hex(), bytes(sk.verify_key).hex()
+    sk = Ed25519PrivateKey.generate()
+    pub = sk.public_key().public_bytes_raw()
+    return sk.private_bytes_raw().hex(), pub.hex()
+
+def sign_decision(decision, private_key_hex, actor_id):
+    """Add a signature entry for actor_id to decision["signatures"]; returns the decision."""
+    _require_backend()
+    message = decision_message(decision)
+    seed = bytes.fromhex(private_key_hex)
+    if BACKEND == "nacl":
+        sk = _NaclSigningKey(seed)
+        sig, pub = sk.sign(message).signature, bytes(sk.verify_key)
+    else:
+        sk = Ed25519PrivateKey.from_private_bytes(seed)
+        sig, pub = sk.sign(message), sk.public_key().public_bytes_raw()
+    decision.setdefault("signatures", []).append({"actor_id": actor_id, "pubkey": pub.hex(), "sig": sig.hex()})
+    return decision
@@ -1,10 +1,13 @@
 # scripts/aav_calc.py
 # scripts/aav_calc.py
+# spúšťať z koreňa repozitára: python -m src.aav_calc --weights ... --scores ...
 import json
 import numpy as np
 import pandas as pd
 import argparse
 
+from compute_aav import compute_aav_matrix
+
 def compute_aav(weights, scores, biases=None, reciprocities=None):
     weights = np.array(weights, dtype=float)
     scores = np.array(scores, dtype=float)
@@ -30,13 +33,8 @@ def main():
     df = pd.read_csv(args.scores)
     # Assumes columns: Zámer (INT),Existencia (LEX),Múdrosť (WIS),Vzájomnosť (REL),Pravda (VER),Sloboda (LIB),Jednota (UNI),Tvorba (CRE)
     cols = ['Zámer (INT)','Existencia (LEX)','Múdrosť (WIS)','Vzájomnosť (REL)','Pravda (VER)','Sloboda (LIB)','Jednota (UNI)','Tvorba (CRE)']
-    outputs = []
-    for _, row in df.iterrows():
-        scores = [row[c] for c in cols]
-        weights = [w[k] for k in ['INT','LEX','WIS','REL','VER','LIB','UNI','CRE']]
-        aav = compute_aav(weights, scores)
-        outputs.append(aav)
-    df['AAV'] = outputs
+    weights = [w[k] for k in ['INT','LEX','WIS','REL','VER','LIB','UNI','CRE']]
+    df['AAV'] = compute_aav_matrix(weights, df[cols])
     out = args.scores.replace('.csv','_with_aav.csv')
     df.to_csv(out, index=False)
     print("Saved:", out)
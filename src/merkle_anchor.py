@@ -8,7 +8,7 @@ def merkle_root(hashes):
     for i in range(0, len(hashes), 2):
         h1 = hashes[i]
         h2 = hashes[i+1] if i+1 < len(hashes) else h1
-        new_hashes.append(sha256(h1 + h2).hexdigest())
+        new_hashes.append(sha256((h1 + h2).encode()).hexdigest())
     return merkle_root(new_hashes)
 
 # Príklad: Hashes rozhodnutí/logov
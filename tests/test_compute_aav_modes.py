@@ -0,0 +1,72 @@
+# tests/test_compute_aav_modes.py
+"""compute-aav: celý súbor, --chunksize a --workers musia dať rovnaký výstup (a Merkle root)."""
+import csv
+
+import pytest
+
+from axiomatic_tool import (
+    compute_aav_csv_chunked, compute_aav_csv_sharded, compute_aav_matrix,
+    merkle_root_from_csv_rows, read_scores_csv,
+)
+
+COLS = ['Zámer (INT)', 'Existencia (LEX)', 'Múdrosť (WIS)', 'Vzájomnosť (REL)',
+        'Pravda (VER)', 'Sloboda (LIB)', 'Jednota (UNI)', 'Tvorba (CRE)']
+WEIGHTS = [1.0, 0.95, 0.9, 0.85, 0.9, 0.8, 0.85, 0.95]
+
+@pytest.fixture
+def scores_csv(tmp_path):
+    # id s úvodnými nulami a celočíselný stĺpec s prázdnymi hodnotami
+    path = tmp_path / "scores.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ID", "Count"] + COLS + ["Status"])
+        for i in range(3000):
+            w.writerow([f"{i:05d}", "" if i % 7 == 0 else i % 5]
+                       + [round(((i * 31 + j * 17) % 1000) / 1000, 3) for j in range(len(COLS))]
+                       + ["ACCEPT" if i % 3 else "REJECT"])
+    return str(path)
+
+def serial_output(in_path, out_path):
+    df = read_scores_csv(in_path, expected_cols=COLS)
+    df['AAV'] = compute_aav_matrix(WEIGHTS, df[COLS])
+    df.to_csv(out_path, index=False)
+
+def test_serial_keeps_text_columns(scores_csv, tmp_path):
+    out = str(tmp_path / "serial.csv")
+    serial_output(scores_csv, out)
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["ID"] == "00000" and rows[0]["Count"] == ""
+    assert rows[1]["Count"] == "1"
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_workers_root_matches_serial(scores_csv, tmp_path, workers):
+    serial, sharded = str(tmp_path / "serial.csv"), str(tmp_path / "sharded.csv")
+    serial_output(scores_csv, serial)
+    compute_aav_csv_sharded(scores_csv, sharded, COLS, WEIGHTS, workers, chunksize=400)
+    assert merkle_root_from_csv_rows(sharded) == merkle_root_from_csv_rows(serial)
+    with open(serial, "rb") as a, open(sharded, "rb") as b:
+        assert a.read() == b.read()
+
+def test_chunked_root_matches_serial(scores_csv, tmp_path):
+    serial, chunked = str(tmp_path / "serial.csv"), str(tmp_path / "chunked.csv")
+    serial_output(scores_csv, serial)
+    compute_aav_csv_chunked(scores_csv, chunked, COLS, WEIGHTS, 250)
+    assert merkle_root_from_csv_rows(chunked) == merkle_root_from_csv_rows(serial)
+    with open(serial, "rb") as a, open(chunked, "rb") as b:
+        assert a.read() == b.read()
+
+def test_workers_keep_quoted_newlines(tmp_path):
+    # pole v úvodzovkách s novým riadkom (aj "" vo vnútri) sa nesmie rozdeliť medzi shardy
+    path = str(tmp_path / "quoted.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["ID", "Dôvod"] + COLS)
+        for i in range(2000):
+            reason = f'riadok {i}\n"citát"\n' * (i % 4) + "koniec"
+            w.writerow([i, reason] + [round(((i * 13 + j * 7) % 100) / 100, 2) for j in range(len(COLS))])
+    serial, sharded = str(tmp_path / "serial.csv"), str(tmp_path / "sharded.csv")
+    serial_output(path, serial)
+    compute_aav_csv_sharded(path, sharded, COLS, WEIGHTS, 4, chunksize=300)
+    with open(serial, "rb") as a, open(sharded, "rb") as b:
+        assert a.read() == b.read()
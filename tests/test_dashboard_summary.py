@@ -0,0 +1,32 @@
+# tests/test_dashboard_summary.py
+"""dashboard-summary: sidecar aj pre prázdny export (len hlavička)."""
+import json
+
+from dashboard_summary import AXIOMS, build_summary
+
+HEADER = ["Dátum"] + [label for _, label in AXIOMS] + ["AAV", "Status"]
+
+def test_header_only_csv(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text(",".join(HEADER) + "\n", encoding="utf-8")
+    summary = build_summary(str(path))
+    assert summary["rows"] == 0
+    assert summary["series"]["index"] == [] and summary["series"]["aav"] == []
+    assert summary["rep7"] is None
+    assert summary["table"]["pages"] == 1 and summary["table"]["first_page"] == []
+    with open(tmp_path / "h.summary.json", encoding="utf-8") as f:
+        assert json.load(f)["rows"] == 0
+
+def test_small_table_series_and_rep7(tmp_path):
+    path = tmp_path / "s.csv"
+    lines = [",".join(HEADER)]
+    for i in range(40):
+        v = 0.2 if i < 10 else 0.8
+        lines.append(",".join([f"2025-01-{i % 28 + 1:02d}"] + [str(v)] * len(AXIOMS) + [str(v), "OK"]))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    summary = build_summary(str(path), points=10, chunksize=7)
+    assert summary["rows"] == 40
+    assert len(summary["series"]["index"]) <= 10
+    assert summary["series"]["index"][0] == 0 and summary["series"]["index"][-1] == 39
+    assert summary["rep7"]["avg_first"] == 0.2 and summary["rep7"]["avg_last"] == 0.8
+    assert summary["rep7"]["alert"] is True
@@ -0,0 +1,82 @@
+# tests/test_embedding_cache.py
+"""
+Embedding cache oproti výpočtu bez cache.
+
+Cache embeduje normalizovaný text (NFC, zlúčené medzery, orezaný) a ukladá
+float32, takže nie je bitovo zhodná s embeddingom surového textu vo float64.
+Povolený rozdiel: pre normalizovaný text iba zaokrúhlenie na float32
+(relatívne EMB_RTOL); pre iný text je vektor z cache embeddingom
+normalize_text(text) bez cache.
+"""
+import threading
+
+import numpy as np
+
+from ai_pipeline import hash_text_embedding_batch
+from embedding_cache import EmbeddingCache, normalize_text
+
+# float32 má 24 platných bitov: relatívna chyba <= 2**-24 ~ 6e-8
+EMB_RTOL = 1e-6
+DIM = 64
+MODEL = f"hash-fallback-{DIM}"
+TEXTS = ["Schválenie rozpočtu", "Zámer  a\tpravda ", "Café decision", "x" * 200, ""]
+
+def uncached(texts):
+    return hash_text_embedding_batch(list(texts), DIM, full_text=True)
+
+def test_cached_matches_uncached_within_float32(tmp_path):
+    cache = EmbeddingCache(disk_path=str(tmp_path))
+    normalized = [normalize_text(t) for t in TEXTS]
+    cached = cache.get_many(TEXTS, MODEL, uncached)
+    np.testing.assert_allclose(cached, uncached(normalized), rtol=EMB_RTOL, atol=0)
+    # zásahy (v procese aj z disku v novej cache) dajú rovnaké vektory ako prvý výpočet
+    np.testing.assert_array_equal(cache.get_many(TEXTS, MODEL, uncached), cached)
+    np.testing.assert_array_equal(EmbeddingCache(disk_path=str(tmp_path)).get_many(TEXTS, MODEL, uncached), cached)
+
+def test_normalized_text_within_float32_of_raw():
+    text = TEXTS[0]
+    assert normalize_text(text) == text
+    cached = EmbeddingCache().get(text, MODEL, lambda t: uncached([t])[0])
+    np.testing.assert_allclose(cached, uncached([text])[0], rtol=EMB_RTOL, atol=0)
+
+def test_concurrent_reads_during_growth(tmp_path):
+    writer = EmbeddingCache(max_bytes=0, disk_path=str(tmp_path))
+    writer.get_many(["seed"], MODEL, uncached)
+    reader = EmbeddingCache(max_bytes=0, disk_path=str(tmp_path))
+    errors = []
+
+    def read():
+        # riadky, ktoré medzitým pripíše writer, vynútia remap zdieľanej mapy vektorov
+        try:
+            for i in range(500):
+                text = f"text {i}"
+                np.testing.assert_allclose(reader.get_many([text], MODEL, uncached)[0],
+                                           uncached([text])[0], rtol=EMB_RTOL, atol=0)
+        except Exception as e:  # pragma: no cover - vyhodnotí sa nižšie
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    writer.get_many([f"text {i}" for i in range(500)], MODEL, uncached)
+    for t in threads:
+        t.join()
+    assert not errors
+
+def test_concurrent_first_use_opens_one_store(tmp_path):
+    EmbeddingCache(disk_path=str(tmp_path)).get_many(["seed"], MODEL, uncached)
+    cache = EmbeddingCache(max_bytes=0, disk_path=str(tmp_path))
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def first_use():
+        # všetky vlákna naraz pri prvom prístupe k disku: store sa otvorí raz
+        barrier.wait()
+        seen.append(cache._disk_store(DIM))
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in seen}) == 1